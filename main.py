@@ -1,6 +1,6 @@
 import sys
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QPushButton, QLabel, QDialog, QFileDialog,
@@ -9,7 +9,10 @@ from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPixmap, QCursor, QIcon
 
 from src.utils.database import Database
+from src.utils.db_writer import DatabaseWriter
 from src.utils.log_parser import LogParser
+from src.utils.log_watcher import LogWatcher
+from src.utils.map_session import MapSession
 from src.utils.item_parser import ItemParser
 from src.utils.resource_path import get_resource_path
 from src.dialogs.boss_kill_dialog import BossKillDialog
@@ -61,14 +64,17 @@ class MapTracker(QMainWindow):
         
         # Initialize components
         self.db = Database()
+        # Tracker writes go through a background thread so a slow disk cannot stall the UI
+        self.db_writer = DatabaseWriter(self.db.db_path)
+        self.db_writer.start()
+        self.last_run_id = None  # Future for the id of the run items are logged against
         self.settings = self.load_settings()
-        self.log_parser = LogParser(self.settings.get('log_path', None))
+        self.log_parser = LogParser(self.settings.get('log_path', None), index_path=self.log_index_path())
         self.item_parser = ItemParser()
-        self.current_map_start = None
-        self.current_map_seed = None
-        self.current_map_duration = timedelta()
+        self.map_session = MapSession()
         self.current_character = None
         self.monitoring = False
+        self.log_watcher = None
         self.map_timer = QTimer()
         self.map_timer.timeout.connect(self.update_map_timer)
         self.map_timer.setInterval(1000)  # Update every second
@@ -244,7 +250,8 @@ class MapTracker(QMainWindow):
                 if dialog.exec() == QDialog.DialogCode.Accepted:
                     self.settings['log_path'] = found_path
                     self.save_settings()
-                    self.log_parser = LogParser(found_path)
+                    self.log_parser.close()
+                    self.log_parser = LogParser(found_path, index_path=self.log_index_path())
                     self.map_name_label.setText(f"Log file selected: {Path(found_path).name}")
                     self.activateWindow()  # Bring window to front
                     self.raise_()  # Ensure it's on top
@@ -331,6 +338,10 @@ class MapTracker(QMainWindow):
         with open('settings.json', 'w') as f:
             json.dump(self.settings, f, indent=2)
     
+    def log_index_path(self):
+        # Sidecar index used for time-range lookups in Client.txt
+        return self.settings.get('log_index_path', 'client_log.idx')
+    
     def setup_ui(self):
         # Create central widget and layout
         central_widget = QWidget()
@@ -456,6 +467,8 @@ class MapTracker(QMainWindow):
     
     def on_character_selected(self, character_id):
         self.current_character = self.db.get_character(character_id)
+        # Only the tracked character's deaths make a run a RIP
+        self.map_session.character = self.current_character['name'] if self.current_character else None
         if self.current_character:
             current_build = self.db.get_current_build(character_id)
             character_text = (
@@ -482,6 +495,8 @@ class MapTracker(QMainWindow):
         self.breach_count_spin.setValue(max(0, min(10, current + delta)))
 
     def show_runs_dialog(self):
+        # Show runs that are still being written
+        self.db_writer.flush()
         dialog = MapRunsDialog(self.db, self)
         dialog.exec()
 
@@ -498,8 +513,15 @@ class MapTracker(QMainWindow):
             self.settings['log_path'] = file_name
             self.save_settings()
             
-            # Update log parser
-            self.log_parser = LogParser(file_name)
+            # Update log parser, the watcher's worker must release the old one first
+            was_monitoring = self.log_watcher is not None
+            if was_monitoring:
+                self.log_watcher.stop()
+            self.log_parser.close()
+            self.log_parser = LogParser(file_name, index_path=self.log_index_path())
+            if was_monitoring:
+                # Keep monitoring, but watch the newly selected file
+                self.setup_log_monitoring()
             self.map_name_label.setText(f"Log file selected: {Path(file_name).name}")
             self.activateWindow()  # Bring window to front
             self.raise_()  # Ensure it's on top
@@ -528,39 +550,41 @@ class MapTracker(QMainWindow):
             self.monitor_btn.setText("Start Monitoring")
             self.monitor_btn.setProperty("monitoring", "false")
             self.monitor_btn.setStyle(self.monitor_btn.style())
-            if hasattr(self, 'timer'):
-                self.timer.stop()
+            if self.log_watcher:
+                self.log_watcher.stop()
+                self.log_watcher = None
 
     def setup_log_monitoring(self):
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.check_log_updates)
-        self.timer.start(1000)  # Check every second
+        # Wake on filesystem change notifications instead of polling every second
+        self.log_watcher = LogWatcher(
+            self.log_parser,
+            debounce_ms=self.settings.get('log_debounce_ms', 50),
+            backend=self.settings.get('log_watch_backend', 'auto'),
+            safety_interval=self.settings.get('log_safety_interval_ms', 500) / 1000,
+            parent=self
+        )
+        self.log_watcher.events_ready.connect(self.handle_log_events)
+        self.log_watcher.start()
 
-    def check_log_updates(self):
+    def handle_log_events(self, log_events):
         if not self.monitoring:
             return
             
-        log_events = self.log_parser.check_updates()
         for event in log_events:
             if event['type'] == 'map_start':
                 self.handle_map_start(event)
             elif event['type'] == 'map_end':
                 self.handle_map_end(event)
+            elif event['type'] == 'player_death':
+                self.map_session.record_death(event)
 
     def handle_map_start(self, event):
-        # Extract seed from the event
-        seed = event.get('seed')
-        
-        # If we have a current map and entering same instance
-        if self.current_map_seed and seed == self.current_map_seed:
+        # Same seed as the current map means we are re-entering that instance
+        if self.map_session.enter(event):
             # Continuing previous map instance
-            self.current_map_start = event
             self.map_name_label.setText(f"In map: {event['map_name']} (Level {event['map_level']}) (Continued)")
         else:
             # Starting fresh map instance
-            self.current_map_start = event
-            self.current_map_seed = seed
-            self.current_map_duration = timedelta()
             self.map_name_label.setText(f"In map: {event['map_name']} (Level {event['map_level']})")
             
             # Reset mechanic selections for new map
@@ -586,18 +610,17 @@ class MapTracker(QMainWindow):
         self.map_timer.start()
 
     def handle_map_end(self, event):
-        if self.current_map_start:
-            # Calculate duration of this segment
-            segment_duration = event['timestamp'] - self.current_map_start['timestamp']
-            self.current_map_duration += segment_duration
+        if self.map_session.active:
+            # Adds the duration of this segment
+            in_hideout = self.map_session.leave(event)
             
             # Stop the timer while we're out of the map
             self.map_timer.stop()
             
-            next_area = event.get('next_area', '')
-            if next_area.startswith('Hideout'):
+            if in_hideout:
                 # Just temporarily in hideout, keep the map state
-                self.map_name_label.setText(f"Map paused: {self.current_map_start['map_name']} (Level {self.current_map_start['map_level']})")
+                map_start = self.map_session.start_event
+                self.map_name_label.setText(f"Map paused: {map_start['map_name']} (Level {map_start['map_level']})")
                 self.end_map_btn.show()  # Show end map button while paused
             else:
                 # Actually leaving the map, consider it complete
@@ -605,14 +628,14 @@ class MapTracker(QMainWindow):
 
     def handle_manual_map_end(self):
         """Handle manual map completion when user clicks End Map button"""
-        if self.current_map_start:
+        if self.map_session.active:
             self.complete_map()
             
     def complete_map(self):
         """Complete the current map and reset state"""
-        if self.current_map_start:
+        if self.map_session.active:
             # Show completion dialog
-            dialog = MapCompletionDialog(self)
+            dialog = MapCompletionDialog(self, deaths=self.map_session.deaths)
             result = dialog.exec()
             
             # Get completion status
@@ -621,7 +644,8 @@ class MapTracker(QMainWindow):
             if completion_status:
                 # Get boss count
                 boss_count = 0  # Default to 0 for no boss
-                has_boss = self.current_map_start['has_boss']
+                run = self.map_session.to_run()
+                has_boss = run['has_boss']
                 
                 # If map has a boss and either completed or RIP with boss kill
                 if has_boss:
@@ -639,13 +663,13 @@ class MapTracker(QMainWindow):
                         boss_dialog = BossKillDialog(self)
                         boss_count = boss_dialog.exec()
                 
-                duration_seconds = int(self.current_map_duration.total_seconds())
-                self.db.add_map_run(
-                    self.current_map_start['map_name'],
-                    self.current_map_start['map_level'],
+                self.last_run_id = self.db_writer.submit(
+                    'add_map_run',
+                    run['map_name'],
+                    run['map_level'],
                     boss_count,
-                    self.current_map_start['timestamp'],
-                    duration_seconds,
+                    run['start_time'],
+                    run['duration'],
                     [],  # Items will be added later
                     completion_status,
                     self.breach_icon.is_active(),
@@ -655,9 +679,7 @@ class MapTracker(QMainWindow):
                     self.breach_count_spin.value(),
                     self.current_character['id'] if self.current_character else None
                 )
-                self.current_map_start = None
-                self.current_map_seed = None
-                self.current_map_duration = timedelta()
+                self.map_session.reset()
                 status_text = "Complete" if completion_status == 'complete' else "RIP"
                 self.map_name_label.setText(f"Map {status_text}")
                 self.end_map_btn.hide()
@@ -673,9 +695,8 @@ class MapTracker(QMainWindow):
                 self.ritual_icon.hide()
 
     def update_map_timer(self):
-        if self.current_map_start:
-            current_segment = datetime.now() - self.current_map_start['timestamp']
-            total_duration = self.current_map_duration + current_segment
+        if self.map_session.active:
+            total_duration = self.map_session.elapsed(datetime.now())
             minutes = int(total_duration.total_seconds()) // 60
             seconds = int(total_duration.total_seconds()) % 60
             self.timer_label.setText(f"{minutes:02d}:{seconds:02d}")
@@ -683,11 +704,27 @@ class MapTracker(QMainWindow):
     def show_item_entry_dialog(self):
         dialog = ItemEntryDialog(self.item_parser, self)
         if dialog.exec() == QDialog.DialogCode.Accepted and dialog.items:
-            self.db.add_items_to_latest_map(dialog.items)
+            run_id = self.last_run_id
+            if run_id is not None and not (run_id.done() and run_id.exception() is not None):
+                # The writer thread swaps in the new run's id, the UI never waits for it
+                self.db_writer.submit('add_items_to_map', run_id, dialog.items)
+            else:
+                # No run was recorded this session, or writing it failed
+                self.db_writer.submit('add_items_to_latest_map', dialog.items)
             self.log_items_btn.hide()
             self.map_name_label.setText("Not in map")
             self.timer_label.hide()
 
+    def closeEvent(self, event):
+        # Stop reading the log first so nothing reaches the writer after it stops
+        if self.log_watcher:
+            self.log_watcher.stop()
+            self.log_watcher = None
+        self.log_parser.close()
+        # Write anything still queued before the app exits
+        self.db_writer.stop()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon(get_resource_path("src/images/app/icon.png")))
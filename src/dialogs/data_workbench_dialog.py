@@ -11,6 +11,8 @@ from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
 class DataWorkbenchDialog(QDialog):
+    RECENT_RUNS = 2000  # Newest runs loaded for the raw table and per-run plots
+    
     def __init__(self, db, parent=None):
         super().__init__(parent)
         self.db = db
@@ -202,9 +204,8 @@ class DataWorkbenchDialog(QDialog):
         """)
         
     def load_data(self):
-        # Load map runs
-        runs = self.db.get_map_runs()
-        self.df = pd.DataFrame(runs)
+        # Load the newest map runs, totals come from the rollup tables
+        self.df = self.load_recent_runs()
         
         # Load characters and builds
         characters = self.db.get_characters()
@@ -221,18 +222,13 @@ class DataWorkbenchDialog(QDialog):
                 self.build_combo.addItem(build_text, build['id'])
         
         # Extract unique map levels, names, and currency types
-        map_levels = sorted(self.df['map_level'].unique())
+        map_levels = [row['map_level'] for row in self.db.rollup_stats(('map_level',)) if row['map_level']]
         self.level_filter_combo.addItems([str(level) for level in map_levels])
 
-        map_names = sorted(self.df['map_name'].unique())
+        map_names = [row['map_name'] for row in self.db.rollup_stats(('map_name',)) if row['map_name']]
         self.map_filter_combo.addItems(map_names)
 
-        currency_types = set()
-        for items in self.df['items']:
-            for item in items:
-                if isinstance(item, dict) and item.get('name', '').endswith('_Currency'):
-                    currency_types.add(item['name'].replace('_Currency', ''))
-        
+        currency_types = [name.replace('_Currency', '') for name in self.db.get_item_totals('_Currency')]
         self.currency_type_combo.addItems(sorted(currency_types))
         
         # Update visualizations
@@ -242,6 +238,11 @@ class DataWorkbenchDialog(QDialog):
         self.update_mechanic_analysis()
         self.update_raw_data_table()
         
+    def load_recent_runs(self, filters=None):
+        """The newest RECENT_RUNS runs matching filters, without their items"""
+        runs = self.db.query_runs(filters, limit=self.RECENT_RUNS, with_items=False)
+        return pd.DataFrame(runs)
+        
     def update_char_build_combo(self):
         """Update build filter dropdown based on selected character"""
         self.char_build_combo.clear()
@@ -273,19 +274,15 @@ class DataWorkbenchDialog(QDialog):
             
             # Character
             char_text = ""
-            if run['character_id']:
-                char = self.db.get_character(run['character_id'])
-                if char:
-                    char_text = (f"{char['name']} (Level {char['level']} {char['class']}"
-                               f"{' - ' + char['ascendancy'] if char['ascendancy'] else ''})")
+            if pd.notna(run['character_name']):
+                char_text = (f"{run['character_name']} (Level {int(run['character_level'])} {run['character_class']}"
+                           f"{' - ' + run['character_ascendancy'] if pd.notna(run['character_ascendancy']) else ''})")
             self.data_table.setItem(i, 3, QTableWidgetItem(char_text))
             
             # Build
             build_text = ""
-            if run['build_id']:
-                build = self.db.get_build(run['build_id'])
-                if build:
-                    build_text = f"{build['name']} ({build['url']})"
+            if pd.notna(run['build_name']):
+                build_text = f"{run['build_name']} ({run['build_url']})"
             self.data_table.setItem(i, 4, QTableWidgetItem(build_text))
             
             # Mechanics
@@ -300,13 +297,11 @@ class DataWorkbenchDialog(QDialog):
                 mechanics.append("Ritual")
             self.data_table.setItem(i, 5, QTableWidgetItem(", ".join(mechanics)))
             
-            # Currency summary
+            # Currency summary from the totals kept on each run
             currency_summary = []
-            for item in run['items']:
-                if isinstance(item, dict) and item.get('name', '').endswith('_Currency'):
-                    name = item['name'].replace('_Currency', '')
-                    count = item.get('stack_size', 0)
-                    currency_summary.append(f"{name} x{count}")
+            for item_name, column in self.db.SUMMARY_CURRENCIES.items():
+                if run[column]:
+                    currency_summary.append(f"{item_name.replace('_Currency', '')} x{int(run[column])}")
             self.data_table.setItem(i, 6, QTableWidgetItem(", ".join(currency_summary)))
             
         # Adjust column widths
@@ -326,20 +321,22 @@ class DataWorkbenchDialog(QDialog):
         build_id = self.build_combo.currentData()
         
         if build_id is not None:
-            # Filter data for selected build
-            build_df = self.df[self.df['build_id'] == build_id]
+            # Newest runs of the selected build
+            build_df = self.load_recent_runs({'build_id': build_id})
             
             if len(build_df) > 0:
+                # Totals come from the rollup tables rather than the runs
+                totals = self.db.rollup_stats(filters={'build_id': build_id})[0]
+                by_level = self.db.rollup_stats(('map_level',), {'build_id': build_id})
+                
                 # Map completion rate pie chart
-                complete = len(build_df[build_df['completion_status'] == 'complete'])
-                rips = len(build_df[build_df['completion_status'] == 'rip'])
-                ax1.pie([complete, rips], labels=['Complete', 'RIP'], colors=['#44ff44', '#ff4444'],
+                ax1.pie([totals['completed'], totals['rips']], labels=['Complete', 'RIP'], colors=['#44ff44', '#ff4444'],
                        autopct='%1.1f%%')
                 ax1.set_title('Map Completion Rate')
                 
                 # Average duration by map level
-                avg_duration = build_df.groupby('map_level')['duration'].mean() / 60  # Convert to minutes
-                ax2.bar(avg_duration.index, avg_duration.values)
+                ax2.bar([row['map_level'] for row in by_level],
+                        [row['avg_duration'] / 60 for row in by_level])  # Convert to minutes
                 ax2.set_xlabel('Map Level')
                 ax2.set_ylabel('Average Duration (minutes)')
                 ax2.set_title('Average Map Duration by Level')
@@ -352,12 +349,10 @@ class DataWorkbenchDialog(QDialog):
                 ax3.tick_params(axis='x', rotation=45)
                 
                 # Add summary text
-                total_maps = len(build_df)
-                avg_duration_all = build_df['duration'].mean() / 60
                 ax3.text(0.02, 0.98, 
-                        f'Total Maps: {total_maps}\n'
-                        f'Average Duration: {avg_duration_all:.1f}m\n'
-                        f'Highest Level: {build_df["map_level"].max()}',
+                        f'Total Maps: {totals["runs"]}\n'
+                        f'Average Duration: {totals["avg_duration"] / 60:.1f}m\n'
+                        f'Highest Level: {totals["max_level"]}',
                         transform=ax3.transAxes,
                         verticalalignment='top',
                         bbox=dict(facecolor='#1a1a1a', alpha=0.8))
@@ -370,17 +365,18 @@ class DataWorkbenchDialog(QDialog):
         else:
             # Compare all builds
             build_stats = []
+            totals = {row['build_id']: row for row in self.db.rollup_stats(('build_id',))}
             for char in self.db.get_characters():
                 builds = self.db.get_builds(char['id'])
                 for build in builds:
-                    build_df = self.df[self.df['build_id'] == build['id']]
-                    if len(build_df) > 0:
+                    build_totals = totals.get(build['id'])
+                    if build_totals:
                         stats = {
                             'name': f"{build['name']} ({char['name']})",
-                            'total_maps': len(build_df),
-                            'completion_rate': len(build_df[build_df['completion_status'] == 'complete']) / len(build_df) * 100,
-                            'avg_duration': build_df['duration'].mean() / 60,
-                            'highest_level': build_df['map_level'].max()
+                            'total_maps': build_totals['runs'],
+                            'completion_rate': build_totals['completed'] / build_totals['runs'] * 100,
+                            'avg_duration': build_totals['avg_duration'] / 60,
+                            'highest_level': build_totals['max_level']
                         }
                         build_stats.append(stats)
             
@@ -441,22 +437,23 @@ class DataWorkbenchDialog(QDialog):
         build_id = self.char_build_combo.currentData()
         
         if char_id is not None:
-            # Filter data for selected character and build
-            char_df = self.df[self.df['character_id'] == char_id]
-            if build_id is not None:
-                char_df = char_df[char_df['build_id'] == build_id]
+            # Newest runs of the selected character and build
+            char_df = self.load_recent_runs({'character_id': char_id, 'build_id': build_id})
             
             if len(char_df) > 0:
+                # Totals come from the rollup tables rather than the runs
+                filters = {'character_id': char_id, 'build_id': build_id}
+                totals = self.db.rollup_stats(filters=filters)[0]
+                by_level = self.db.rollup_stats(('map_level',), filters)
+                
                 # Map completion rate pie chart
-                complete = len(char_df[char_df['completion_status'] == 'complete'])
-                rips = len(char_df[char_df['completion_status'] == 'rip'])
-                ax1.pie([complete, rips], labels=['Complete', 'RIP'], colors=['#44ff44', '#ff4444'],
+                ax1.pie([totals['completed'], totals['rips']], labels=['Complete', 'RIP'], colors=['#44ff44', '#ff4444'],
                        autopct='%1.1f%%')
                 ax1.set_title('Map Completion Rate')
                 
                 # Average duration by map level
-                avg_duration = char_df.groupby('map_level')['duration'].mean() / 60  # Convert to minutes
-                ax2.bar(avg_duration.index, avg_duration.values)
+                ax2.bar([row['map_level'] for row in by_level],
+                        [row['avg_duration'] / 60 for row in by_level])  # Convert to minutes
                 ax2.set_xlabel('Map Level')
                 ax2.set_ylabel('Average Duration (minutes)')
                 ax2.set_title('Average Map Duration by Level')
@@ -469,12 +466,10 @@ class DataWorkbenchDialog(QDialog):
                 ax3.tick_params(axis='x', rotation=45)
                 
                 # Add summary text
-                total_maps = len(char_df)
-                avg_duration_all = char_df['duration'].mean() / 60
                 ax3.text(0.02, 0.98, 
-                        f'Total Maps: {total_maps}\n'
-                        f'Average Duration: {avg_duration_all:.1f}m\n'
-                        f'Highest Level: {char_df["map_level"].max()}',
+                        f'Total Maps: {totals["runs"]}\n'
+                        f'Average Duration: {totals["avg_duration"] / 60:.1f}m\n'
+                        f'Highest Level: {totals["max_level"]}',
                         transform=ax3.transAxes,
                         verticalalignment='top',
                         bbox=dict(facecolor='#1a1a1a', alpha=0.8))
@@ -487,15 +482,16 @@ class DataWorkbenchDialog(QDialog):
         else:
             # Compare all characters
             char_stats = []
+            totals = {row['character_id']: row for row in self.db.rollup_stats(('character_id',))}
             for char in self.db.get_characters():
-                char_df = self.df[self.df['character_id'] == char['id']]
-                if len(char_df) > 0:
+                char_totals = totals.get(char['id'])
+                if char_totals:
                     stats = {
                         'name': char['name'],
-                        'total_maps': len(char_df),
-                        'completion_rate': len(char_df[char_df['completion_status'] == 'complete']) / len(char_df) * 100,
-                        'avg_duration': char_df['duration'].mean() / 60,
-                        'highest_level': char_df['map_level'].max()
+                        'total_maps': char_totals['runs'],
+                        'completion_rate': char_totals['completed'] / char_totals['runs'] * 100,
+                        'avg_duration': char_totals['avg_duration'] / 60,
+                        'highest_level': char_totals['max_level']
                     }
                     char_stats.append(stats)
             
@@ -541,12 +537,14 @@ class DataWorkbenchDialog(QDialog):
         self.character_figure.tight_layout()
         self.character_canvas.draw()
         
-    def get_currency_count(self, items, currency_type):
-        count = 0
-        for item in items:
-            if isinstance(item, dict) and item.get('name') == f"{currency_type}_Currency":
-                count += item.get('stack_size', 0)
-        return count
+    def get_currency_count(self, currency_type):
+        """Stack size of one currency per run id, summed in the database"""
+        item_name = f"{currency_type}_Currency"
+        column = self.db.SUMMARY_CURRENCIES.get(item_name)
+        if column:
+            # Common currencies are already totalled on each run
+            return dict(zip(self.df['id'], self.df[column]))
+        return self.db.get_item_count_by_run(item_name)
         
     def update_currency_analysis(self):
         currency_type = self.currency_type_combo.currentText()
@@ -579,9 +577,8 @@ class DataWorkbenchDialog(QDialog):
             filtered_df = filtered_df[filtered_df['map_name'] == map_filter]
             
         # Calculate currency counts
-        filtered_df['currency_count'] = filtered_df['items'].apply(
-            lambda items: self.get_currency_count(items, currency_type)
-        )
+        currency_counts = self.get_currency_count(currency_type)
+        filtered_df['currency_count'] = filtered_df['id'].map(lambda run_id: currency_counts.get(run_id, 0))
         
         # Clear the figure
         self.currency_figure.clear()
@@ -627,14 +624,10 @@ class DataWorkbenchDialog(QDialog):
                 # Get character and build info
                 char_info = ""
                 build_info = ""
-                if run['character_id']:
-                    char = self.db.get_character(run['character_id'])
-                    if char:
-                        char_info = f"\nCharacter: {char['name']}"
-                if run['build_id']:
-                    build = self.db.get_build(run['build_id'])
-                    if build:
-                        build_info = f"\nBuild: {build['name']}"
+                if pd.notna(run['character_name']):
+                    char_info = f"\nCharacter: {run['character_name']}"
+                if pd.notna(run['build_name']):
+                    build_info = f"\nBuild: {run['build_name']}"
                 
                 # Create data plate text
                 text = (f"Map: {run['map_name']} (Level {run['map_level']})\n"
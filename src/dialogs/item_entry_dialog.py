@@ -1,16 +1,95 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-                           QScrollArea, QWidget)
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QClipboard
+                           QListView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QClipboard, QColor
 from PyQt6.QtWidgets import QApplication
 
+from ..utils.clipboard_ingest import ClipboardIngestor
+
+# Color mapping based on rarity and special suffixes
+RARITY_COLORS = {
+    'Normal': '#ffffff',  # White
+    'Magic': '#8888ff',   # Blue
+    'Rare': '#ffff77',    # Yellow
+    'Unique': '#af6025',  # Orange/Brown
+    'Currency': '#aa9e82'  # Currency color
+}
+
+SUFFIX_COLORS = {
+    '_pinkey': '#ff0000',  # Red for pinnacle keys
+    '_trials': '#b7410e',  # Rust color for trials items
+    '_gem': '#c0c0c0',  # Silver color for gems
+    '_socket': '#add8e6'  # Light blue color for socketables
+}
+
+def item_color(name, rarity):
+    """Text color of an item, flasks and charms use their rarity color like other items"""
+    for suffix, color in SUFFIX_COLORS.items():
+        if name.endswith(suffix):
+            return color
+    return RARITY_COLORS.get(rarity, '#cccccc')
+
+class ItemListModel(QAbstractListModel):
+    """Rows of the logged items, one per item name
+
+    Stack sizes are read from items (name -> item) when a row is drawn. The
+    label and color of a row are worked out once, when its item is first seen.
+    """
+    def __init__(self, items, parent=None):
+        super().__init__(parent)
+        self.items = items
+        self._rows = []  # (name, display name, color)
+        self._row_of = {}  # Name -> row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name, display_name, color = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{display_name} x{self.items[name].get('stack_size', 1)}"
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return color
+        return None
+
+    def update_names(self, names):
+        """Add rows for new names and repaint changed ones, return True if rows were added"""
+        new_names = []
+        for name in dict.fromkeys(names):
+            row = self._row_of.get(name)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+            # Skip items with system text
+            elif (name != 'Unknown Item' and
+                  not name.startswith('Item Class:') and
+                  not name.startswith('Stack Size:') and
+                  not name.startswith('Rarity:')):
+                new_names.append(name)
+        if not new_names:
+            return False
+        
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_names) - 1)
+        for name in new_names:
+            rarity = self.items[name].get('display_rarity', 'Normal')
+            self._row_of[name] = len(self._rows)
+            self._rows.append((name, name.rsplit('_', 1)[0], QColor(item_color(name, rarity))))
+        self.endInsertRows()
+        return True
+
 class ItemEntryDialog(QDialog):
+    _items_ready = pyqtSignal()  # Emitted from the parser thread
+    
     def __init__(self, item_parser, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Enter Map Items")
         self.setMinimumWidth(400)
-        self.items = []
         self.item_parser = item_parser
+        self.ingestor = ClipboardIngestor(item_parser, on_ready=self._items_ready.emit)
+        self._items_ready.connect(self.merge_parsed_items)
         self.setup_ui()
         self.setup_clipboard_monitoring()
         
@@ -18,19 +97,29 @@ class ItemEntryDialog(QDialog):
         layout = QVBoxLayout(self)
         
         # Instructions
-        instructions = QLabel("Ctrl+C items from the game.\nThey will be automatically added to the list.")
+        instructions = QLabel("Ctrl+C items from the game.\nThey will be automatically added to the list.\n"
+                              "Copying the same item twice in a row counts it once.")
         instructions.setStyleSheet("color: #ffffff; font-size: 14px;")
         layout.addWidget(instructions)
         
-        # Items list in a scroll area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
+        self.items_label = QLabel("Items: None")
+        self.items_label.setStyleSheet("color: #cccccc;")
+        layout.addWidget(self.items_label)
+        
+        # Items list, only rows that changed are redrawn
+        self.items_model = ItemListModel(self.ingestor.items, self)
+        self.items_view = QListView()
+        self.items_view.setModel(self.items_model)
+        self.items_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.items_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.items_view.setSpacing(2)
+        self.items_view.setStyleSheet("""
+            QListView {
                 border: 1px solid #3d3d3d;
                 background-color: #2d2d2d;
                 border-radius: 4px;
                 min-height: 200px;
+                padding: 8px;
             }
             QScrollBar:vertical {
                 border: none;
@@ -48,19 +137,7 @@ class ItemEntryDialog(QDialog):
                 background: none;
             }
         """)
-        
-        self.items_widget = QWidget()
-        self.items_layout = QVBoxLayout(self.items_widget)
-        self.items_layout.setSpacing(5)
-        self.items_layout.setContentsMargins(10, 10, 10, 10)
-        
-        self.items_label = QLabel("Items: None")
-        self.items_label.setStyleSheet("color: #cccccc;")
-        self.items_layout.addWidget(self.items_label)
-        self.items_layout.addStretch()
-        
-        self.scroll_area.setWidget(self.items_widget)
-        layout.addWidget(self.scroll_area)
+        layout.addWidget(self.items_view)
         
         # Done button
         self.done_btn = QPushButton("Done")
@@ -88,97 +165,30 @@ class ItemEntryDialog(QDialog):
         self.clipboard = QApplication.clipboard()
         self.clipboard.dataChanged.connect(self.handle_clipboard)
         
-    def handle_clipboard(self):
-        text = self.clipboard.text()
-        if text:
-            # Parse new items from clipboard
-            new_items = self.item_parser.parse_items(text)
-            if new_items:
-                # Update existing items with new items
-                for new_item in new_items:
-                    name = new_item['name']
-                    found = False
-                    # Look for existing item with same name
-                    for item in self.items:
-                        if item['name'] == name:
-                            # Update stack size
-                            item['stack_size'] += new_item['stack_size']
-                            found = True
-                            break
-                    if not found:
-                        # Add new item if not found
-                        self.items.append(new_item)
-                self.update_items_display()
-                
-    def update_items_display(self):
-        # Clear existing items
-        for i in reversed(range(self.items_layout.count())):
-            widget = self.items_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-        
-        if not self.items:
-            no_items = QLabel("Items: None")
-            no_items.setStyleSheet("color: #cccccc;")
-            self.items_layout.addWidget(no_items)
-            self.items_layout.addStretch()
-            return
+    @property
+    def items(self):
+        """Logged items with their total stack sizes, in the order first copied"""
+        return list(self.ingestor.items.values())
         
-        # Add header
-        header = QLabel("Items:")
-        header.setStyleSheet("color: #ffffff; font-weight: bold;")
-        self.items_layout.addWidget(header)
+    def handle_clipboard(self):
+        # Parsed on the ingestor's thread, merged in merge_parsed_items
+        self.ingestor.feed(self.clipboard.text())
         
-        # Add items
-        for item in self.items:
-            name = item.get('name', 'Unknown')
-            # Skip items with system text
-            if (name != 'Unknown Item' and 
-                not name.startswith('Item Class:') and 
-                not name.startswith('Stack Size:') and 
-                not name.startswith('Rarity:')):
-                quantity = item.get('stack_size', 1)
-                rarity = item.get('display_rarity', 'Normal')
-                
-                # Extract name and rarity
-                name_parts = name.rsplit('_', 1)
-                display_name = name_parts[0]
-                rarity = item.get('display_rarity', 'Normal')
-                
-                # Color mapping based on rarity and special suffixes
-                rarity_colors = {
-                    'Normal': '#ffffff',  # White
-                    'Magic': '#8888ff',   # Blue
-                    'Rare': '#ffff77',    # Yellow
-                    'Unique': '#af6025',  # Orange/Brown
-                    'Currency': '#aa9e82'  # Currency color
-                }
+    def merge_parsed_items(self):
+        changed = self.ingestor.drain()
+        if changed:
+            self.update_items_display(changed)
+            
+    def done(self, result):
+        # Items copied just before closing are still counted
+        self.clipboard.dataChanged.disconnect(self.handle_clipboard)
+        self.ingestor.drain(wait=True)
+        self.ingestor.stop()
+        super().done(result)
                 
-                # Check for special suffixes
-                if name.endswith('_pinkey'):
-                    color = '#ff0000'  # Red for pinnacle keys
-                elif name.endswith('_trials'):
-                    color = '#b7410e'  # Rust color for trials items
-                elif name.endswith('_gem'):
-                    color = '#c0c0c0'  # Silver color for gems
-                elif name.endswith('_socket'):
-                    color = '#add8e6'  # Light blue color for socketables
-                elif name.endswith('_flask'):
-                    color = rarity_colors.get(rarity, '#cccccc')  # Use rarity color for flasks
-                elif name.endswith('_charm'):
-                    color = rarity_colors.get(rarity, '#cccccc')  # Use rarity color for charms
-                else:
-                    color = rarity_colors.get(rarity, '#cccccc')
-                item_label = QLabel(f"{display_name} x{quantity}")
-                item_label.setStyleSheet(f"color: {color};")
-                self.items_layout.addWidget(item_label)
-        
-        self.items_layout.addStretch()
-        
-        # Scroll to bottom after a brief delay to ensure layout is updated
-        QTimer.singleShot(100, self.scroll_to_bottom)
-
-    def scroll_to_bottom(self):
-        """Scroll the view to the bottom"""
-        scrollbar = self.scroll_area.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+    def update_items_display(self, changed):
+        """Show the items whose names are in changed, new ones are added at the bottom"""
+        if self.items_model.update_names(changed):
+            self.items_label.setText("Items:")
+            self.items_label.setStyleSheet("color: #ffffff; font-weight: bold;")
+            self.items_view.scrollToBottom()
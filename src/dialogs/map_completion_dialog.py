@@ -1,8 +1,9 @@
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
 
 class MapCompletionDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, deaths=0):
         super().__init__(parent)
+        self.deaths = deaths  # Deaths seen in Client.txt during the map
         self.setWindowTitle("Map Completion Status")
         self.setMinimumWidth(300)
         self.setup_ui()
@@ -13,6 +14,8 @@ class MapCompletionDialog(QDialog):
         
         # Status label
         label = QLabel("How did the map end?")
+        if self.deaths:
+            label.setText(f"How did the map end? ({self.deaths} death{'s' if self.deaths > 1 else ''} logged)")
         label.setStyleSheet("color: #ffffff; font-size: 14px;")
         layout.addWidget(label)
         
@@ -43,6 +46,9 @@ class MapCompletionDialog(QDialog):
         """)
         self.rip_btn.clicked.connect(lambda: self.done(2))
         
+        # Suggest RIP when the log shows the character died
+        (self.rip_btn if self.deaths else self.complete_btn).setDefault(True)
+        
         button_layout.addWidget(self.complete_btn)
         button_layout.addWidget(self.rip_btn)
         layout.addLayout(button_layout)
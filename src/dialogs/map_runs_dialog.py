@@ -1,17 +1,21 @@
 import csv
+import os
 from datetime import datetime
 from pathlib import Path
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
                            QListWidget, QListWidgetItem, QFileDialog, QMessageBox,
-                           QComboBox)
+                           QComboBox, QProgressDialog, QApplication)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
 from ..utils.resource_path import get_resource_path
+from ..utils.log_backfill import backfill_map_runs
 
 from .map_run_details_dialog import MapRunDetailsDialog
 from .data_workbench_dialog import DataWorkbenchDialog
 
 class MapRunsDialog(QDialog):
+    PAGE_SIZE = 100  # Runs fetched from the database at a time while scrolling
+    
     def __init__(self, db, parent=None):
         super().__init__(parent)
         self.db = db
@@ -25,6 +29,10 @@ class MapRunsDialog(QDialog):
         }
         self.selected_character = None
         self.selected_build = None
+        # Paging state of the run list
+        self.filters = {}
+        self.loaded_runs = 0
+        self.total_runs = 0
         self.setup_ui()
         self.load_runs()
         
@@ -102,6 +110,7 @@ class MapRunsDialog(QDialog):
         self.list_widget = QListWidget()
         self.list_widget.setAlternatingRowColors(True)
         self.list_widget.itemDoubleClicked.connect(self.show_run_details)
+        self.list_widget.verticalScrollBar().valueChanged.connect(self.on_list_scrolled)
         layout.addWidget(self.list_widget)
         
         # Buttons
@@ -120,6 +129,11 @@ class MapRunsDialog(QDialog):
         import_btn.clicked.connect(self.import_from_csv)
         left_buttons.addWidget(import_btn)
         
+        # Client.txt history import button
+        history_btn = QPushButton("Import Client.txt History")
+        history_btn.clicked.connect(self.import_log_history)
+        left_buttons.addWidget(history_btn)
+        
         # Data Analysis button
         analyze_btn = QPushButton("Data Analysis")
         analyze_btn.clicked.connect(self.show_data_analysis)
@@ -246,111 +260,107 @@ class MapRunsDialog(QDialog):
         # Reload runs with new filters
         self.load_runs()
         
+    def current_filters(self):
+        """Filters for Database.query_runs from the selected character, build and mechanics"""
+        return {
+            'character_id': self.selected_character,
+            'build_id': self.selected_build,
+            'mechanics': [mech for mech, active in self.active_filters.items() if active]
+        }
+        
     def load_runs(self):
-        all_runs = self.db.get_map_runs()
-        
-        # Filter runs based on active mechanic filters, selected character, and build
-        runs = []
-        for run in all_runs:
-            include_run = True
-            # Check mechanic filters
-            for mech, active in self.active_filters.items():
-                if active and not run[f'has_{mech}']:
-                    include_run = False
-                    break
-            # Check character filter
-            if self.selected_character is not None and run['character_id'] != self.selected_character:
-                include_run = False
-            # Check build filter
-            if include_run and self.selected_build is not None:
-                if run['build_id'] != self.selected_build:
-                    include_run = False
-            if include_run:
-                runs.append(run)
-                
+        """Show the stats and the first page of runs for the current filters"""
+        # Reset paging first, clearing the list can emit a scroll
+        self.filters = self.current_filters()
+        self.loaded_runs = 0
+        self.total_runs = 0
         self.list_widget.clear()
         
-        total_duration = 0
-        total_maps = len(runs)
-        total_single_bosses = sum(1 for run in runs if run['boss_count'] == 1)
-        total_twin_bosses = sum(1 for run in runs if run['boss_count'] == 2)
-        total_complete = sum(1 for run in runs if run['completion_status'] == 'complete')
-        total_rips = sum(1 for run in runs if run['completion_status'] == 'rip')
+        stats = self.db.run_stats(self.filters)
+        self.total_runs = stats['total']
+        self.load_more_runs()
         
-        for run in runs:
-            start_time = datetime.fromisoformat(run['start_time'])
-            duration_mins = run['duration'] // 60
-            duration_secs = run['duration'] % 60
-            total_duration += run['duration']
-            
-            # Get character and build info if available
-            character_info = ""
-            build_info = ""
-            if run['character_id']:
-                char = self.db.get_character(run['character_id'])
-                if char:
-                    character_info = (f" | Character: {char['name']} "
-                                    f"(Level {char['level']} {char['class']}"
-                                    f"{' - ' + char['ascendancy'] if char['ascendancy'] else ''})")
-            if run['build_id']:
-                build = self.db.get_build(run['build_id'])
-                if build:
-                    build_info = f" | Build: {build['name']} ({build['url']})"
-            
-            # Format item count
-            item_count = len([item for item in run['items'] 
-                            if item['name'] != 'Unknown Item'
-                            and not item['name'].startswith('Item Class:')
-                            and not item['name'].startswith('Stack Size:')
-                            and not item['name'].startswith('Rarity:')])
-            
-            # Create list item with summary
-            boss_text = "No Boss"
-            if run['boss_count'] == 1:
-                boss_text = "Single Boss"
-            elif run['boss_count'] == 2:
-                boss_text = "Twin Boss"
-                
-            # Add mechanic indicators to the summary
-            mechanics_text = []
-            if run['has_breach']:
-                mechanics_text.append(f"Breach ({run['breach_count']})")
-            if run['has_delirium']:
-                mechanics_text.append("Delirium")
-            if run['has_expedition']:
-                mechanics_text.append("Expedition")
-            if run['has_ritual']:
-                mechanics_text.append("Ritual")
-            mechanics_str = f" | Mechanics: {', '.join(mechanics_text)}" if mechanics_text else ""
-                
-            item_text = (f"{run['map_name']} (Level {run['map_level']}) - {start_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                        f"Duration: {duration_mins:02d}:{duration_secs:02d} | "
-                        f"Boss: {boss_text} | "
-                        f"Items: {item_count} | "
-                        f"Status: {'Complete' if run['completion_status'] == 'complete' else 'RIP'}"
-                        f"{character_info}"
-                        f"{mechanics_str}"
-                        f"{build_info}")
-            
-            list_item = QListWidgetItem(item_text)
-            list_item.setData(Qt.ItemDataRole.UserRole, run)  # Store run data
-            self.list_widget.addItem(list_item)
-            
         # Update stats
-        avg_duration = total_duration / total_maps if total_maps > 0 else 0
-        avg_mins = int(avg_duration) // 60
-        avg_secs = int(avg_duration) % 60
+        avg_mins = int(stats['avg_duration']) // 60
+        avg_secs = int(stats['avg_duration']) % 60
         
         self.stats_label.setText(
-            f"Total Maps: {total_maps} | "
-            f"Complete: {total_complete} | "
-            f"RIP: {total_rips} | "
-            f"Single Bosses: {total_single_bosses} | Twin Bosses: {total_twin_bosses} | "
+            f"Total Maps: {stats['total']} | "
+            f"Complete: {stats['complete']} | "
+            f"RIP: {stats['rips']} | "
+            f"Single Bosses: {stats['single_bosses']} | Twin Bosses: {stats['twin_bosses']} | "
             f"Average Duration: {avg_mins:02d}:{avg_secs:02d}"
         )
+        
+    def load_more_runs(self):
+        """Append the next page of runs to the list"""
+        if self.loaded_runs >= self.total_runs:
+            return
+        # The list only shows item counts, items are loaded when a run is opened
+        runs = self.db.query_runs(self.filters, limit=self.PAGE_SIZE, offset=self.loaded_runs, with_items=False)
+        if not runs:
+            # Runs were deleted since the stats were read
+            self.total_runs = self.loaded_runs
+            return
+        self.loaded_runs += len(runs)
+        for run in runs:
+            self.list_widget.addItem(self.create_run_item(run))
+            
+    def on_list_scrolled(self, value):
+        # Fetch the next page shortly before the end of the list is reached
+        if value >= self.list_widget.verticalScrollBar().maximum() - 10:
+            self.load_more_runs()
+            
+    def create_run_item(self, run):
+        start_time = datetime.fromisoformat(run['start_time'])
+        duration_mins = run['duration'] // 60
+        duration_secs = run['duration'] % 60
+        
+        # Character and build info come joined onto the run
+        character_info = ""
+        build_info = ""
+        if run['character_name']:
+            character_info = (f" | Character: {run['character_name']} "
+                            f"(Level {run['character_level']} {run['character_class']}"
+                            f"{' - ' + run['character_ascendancy'] if run['character_ascendancy'] else ''})")
+        if run['build_name']:
+            build_info = f" | Build: {run['build_name']} ({run['build_url']})"
+        
+        # Create list item with summary
+        boss_text = "No Boss"
+        if run['boss_count'] == 1:
+            boss_text = "Single Boss"
+        elif run['boss_count'] == 2:
+            boss_text = "Twin Boss"
+            
+        # Add mechanic indicators to the summary
+        mechanics_text = []
+        if run['has_breach']:
+            mechanics_text.append(f"Breach ({run['breach_count']})")
+        if run['has_delirium']:
+            mechanics_text.append("Delirium")
+        if run['has_expedition']:
+            mechanics_text.append("Expedition")
+        if run['has_ritual']:
+            mechanics_text.append("Ritual")
+        mechanics_str = f" | Mechanics: {', '.join(mechanics_text)}" if mechanics_text else ""
+            
+        item_text = (f"{run['map_name']} (Level {run['map_level']}) - {start_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"Duration: {duration_mins:02d}:{duration_secs:02d} | "
+                    f"Boss: {boss_text} | "
+                    f"Items: {run['item_count']} | "
+                    f"Status: {'Complete' if run['completion_status'] == 'complete' else 'RIP'}"
+                    f"{character_info}"
+                    f"{mechanics_str}"
+                    f"{build_info}")
+        
+        list_item = QListWidgetItem(item_text)
+        list_item.setData(Qt.ItemDataRole.UserRole, run)  # Store run data
+        return list_item
             
     def show_run_details(self, item):
-        run_data = item.data(Qt.ItemDataRole.UserRole)
+        run_data = dict(item.data(Qt.ItemDataRole.UserRole))
+        run_data['items'] = self.db.get_run_items(run_data['id'])
         dialog = MapRunDetailsDialog(run_data, self)
         result = dialog.exec()
         
@@ -359,23 +369,30 @@ class MapRunsDialog(QDialog):
             self.load_runs()
         
     def export_to_csv(self):
-        file_name, _ = QFileDialog.getSaveFileName(
+        file_name, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Export Data",
             str(Path.home() / "atlas_archive_export.csv"),
-            "CSV Files (*.csv)"
+            "CSV Files (*.csv);;Parquet Files (*.parquet)"
         )
         
         if file_name:
             try:
-                self.db.export_to_csv(file_name)
+                base, extension = os.path.splitext(file_name)
+                if extension == '.parquet' or selected_filter.startswith('Parquet'):
+                    # Columnar tables for analysis, with items in their own table.
+                    # The suggested .csv name is replaced rather than extended.
+                    paths = self.db.export_to_parquet(base + '.parquet')
+                else:
+                    # The export names its files after the .csv extension
+                    if extension != '.csv':
+                        base = file_name
+                    self.db.export_to_csv(base + '.csv')
+                    paths = [base + suffix for suffix in ('_maps.csv', '_characters.csv', '_builds.csv')]
                 QMessageBox.information(
                     self,
                     "Export Successful",
-                    f"Data has been exported to:\n"
-                    f"{file_name}\n"
-                    f"{file_name.replace('.csv', '_characters.csv')}\n"
-                    f"{file_name.replace('.csv', '_builds.csv')}"
+                    "Data has been exported to:\n" + "\n".join(paths)
                 )
             except Exception as e:
                 QMessageBox.critical(
@@ -415,8 +432,19 @@ class MapRunsDialog(QDialog):
             "CSV Files (*_builds.csv)"
         )
         
+        progress = QProgressDialog("Importing map runs...", None, 0, 0, self)
+        progress.setWindowTitle("Importing CSV")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.show()
+        
+        def on_progress(stats):
+            progress.setLabelText(f"Imported {stats['rows']:,} rows ({stats['rows_per_second']:,.0f} rows/s)")
+            QApplication.processEvents()
+            
         try:
-            self.db.import_from_csv(chars_file, maps_file, builds_file)
+            # The files are checked before anything is written
+            stats = self.db.import_from_csv(chars_file, maps_file, builds_file, on_progress)
+            progress.close()
             self.load_runs()
             # Reset filters
             self.selected_character = None
@@ -437,15 +465,70 @@ class MapRunsDialog(QDialog):
             QMessageBox.information(
                 self,
                 "Import Successful",
-                "Data has been imported successfully."
+                f"Imported {stats['characters']} characters, {stats['builds']} builds and "
+                f"{stats['runs']:,} map runs in {stats['seconds']:.1f}s "
+                f"({stats['rows_per_second']:,.0f} rows/s)."
             )
         except Exception as e:
+            progress.close()
             QMessageBox.critical(
                 self,
                 "Import Error",
                 f"Failed to import data: {str(e)}"
             )
                 
+    def import_log_history(self):
+        """Reconstruct past map runs from an existing Client.txt"""
+        default_path = str(Path.home())
+        parent = self.parent()
+        if parent is not None and hasattr(parent, 'log_parser'):
+            default_path = str(parent.log_parser.log_path)
+            
+        file_name, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Client.txt History",
+            default_path,
+            "Text Files (*.txt);;All Files (*)"
+        )
+        
+        if not file_name:
+            return
+            
+        progress = QProgressDialog("Scanning Client.txt...", None, 0, 0, self)
+        progress.setWindowTitle("Importing History")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.show()
+        
+        def on_progress(stats):
+            # Only repaint every so often, the scan itself is the expensive part
+            if stats['runs'] % 100 == 0:
+                progress.setLabelText(f"Scanned {stats['lines']:,} lines, found {stats['runs']} map runs")
+                QApplication.processEvents()
+                
+        try:
+            # Imported runs go to the character selected in the filter, if any
+            stats = backfill_map_runs(self.db, file_name, self.selected_character, on_progress)
+        except Exception as e:
+            progress.close()
+            QMessageBox.critical(
+                self,
+                "Import Error",
+                f"Failed to import Client.txt history: {str(e)}"
+            )
+            return
+            
+        progress.close()
+        self.load_runs()
+        QMessageBox.information(
+            self,
+            "Import Successful",
+            f"Scanned {stats['lines']:,} lines in {stats['seconds']:.1f}s "
+            f"({stats['lines_per_second']:,.0f} lines/s).\n"
+            f"Found {stats['runs']} map runs, imported {stats['inserted']} new.\n\n"
+            f"Runs with a death in the log are stored as RIP, the rest as complete. "
+            f"Boss kills and mechanics are not in the log, so imported runs have none."
+        )
+                
     def clear_database(self):
         reply = QMessageBox.question(
             self,
@@ -0,0 +1,125 @@
+"""Benchmark map run insert and CSV import throughput.
+
+Usage:
+    python src/utils/bench_database.py [--runs N] [--import-runs N]
+
+Each setup inserts the same runs, each with a few items, into a fresh
+database file:
+    rollback journal   the old connection: default pragmas, commit per write
+    WAL                Database.PRAGMAS, still committing every write
+    WAL + transaction  Database.PRAGMAS with all writes in one transaction()
+
+The import benchmark writes a CSV export of --import-runs runs and times
+Database.import_from_csv restoring it into a fresh database.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.database import Database
+
+
+class RollbackJournalDatabase(Database):
+    PRAGMAS = ()
+
+
+ITEMS = [
+    {'name': 'Exalted Orb_Currency', 'stack_size': 1, 'rarity': 'Currency', 'item_class': 'Stackable Currency'},
+    {'name': 'Chaos Orb_Currency', 'stack_size': 2, 'rarity': 'Currency', 'item_class': 'Stackable Currency'},
+    {'name': 'Gold Ring', 'stack_size': 1, 'rarity': 'Rare', 'item_class': 'Rings'}
+]
+
+
+def insert_runs(db, count, batched):
+    def write():
+        for i in range(count):
+            db.add_map_run(f'Map {i % 20}', 65 + i % 15, i % 3, f'2025-01-{1 + i // 1440 % 28:02d} '
+                           f'{i // 60 % 24:02d}:{i % 60:02d}:00', 300, [], has_breach=i % 2 == 0)
+            db.add_items_to_latest_map(ITEMS)
+
+    if batched:
+        with db.transaction():
+            write()
+    else:
+        write()
+
+
+def bench(database_class, count, batched):
+    with tempfile.TemporaryDirectory() as directory:
+        db = database_class(os.path.join(directory, 'bench.db'))
+        started = time.perf_counter()
+        insert_runs(db, count, batched)
+        elapsed = time.perf_counter() - started
+        stored = db.conn.execute('SELECT COUNT(*) FROM map_runs').fetchone()[0]
+        db.conn.close()
+    assert stored == count
+    return elapsed
+
+
+def write_export(directory, count):
+    """CSV files in the export_to_csv format, with count runs for one character"""
+    paths = [os.path.join(directory, f'bench_{name}.csv') for name in ('characters', 'maps', 'builds')]
+    with open(paths[0], 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Name', 'Level', 'Class', 'Ascendancy', 'Current Build ID'])
+        writer.writerow([1, 'Wanderer', 90, 'Monk', 'Invoker', 1])
+    with open(paths[2], 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Character ID', 'Name', 'URL', 'Created At', 'Updated At'])
+        writer.writerow([1, 1, 'Tempest Flurry', '', '2025-01-01 00:00:00', '2025-01-01 00:00:00'])
+    items = ', '.join(f"{item['name']} x{item['stack_size']}" for item in ITEMS)
+    with open(paths[1], 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Map Name', 'Map Level', 'Boss Count', 'Start Time', 'Duration', 'Items', 'Status',
+                         'Has Breach', 'Has Delirium', 'Has Expedition', 'Has Ritual', 'Breach Count',
+                         'Character ID', 'Build ID'])
+        for i in range(count):
+            writer.writerow([i + 1, f'Map {i % 20}', 65 + i % 15, i % 3, f'2025-{1 + i // 40000 % 12:02d}-'
+                             f'{1 + i // 1440 % 28:02d} {i // 60 % 24:02d}:{i % 60:02d}:00', '05:00', items,
+                             'Complete' if i % 10 else 'RIP', 'Yes' if i % 2 else 'No', 'No', 'No', 'No',
+                             i % 2, 1, 1])
+    return paths
+
+
+def bench_import(count):
+    with tempfile.TemporaryDirectory() as directory:
+        characters_file, maps_file, builds_file = write_export(directory, count)
+        db = Database(os.path.join(directory, 'bench.db'))
+        started = time.perf_counter()
+        db.import_from_csv(characters_file, maps_file, builds_file, dry_run=True)
+        validated = time.perf_counter() - started
+        stats = db.import_from_csv(characters_file, maps_file, builds_file)
+        db.conn.close()
+    print(f"\nImporting a CSV export of {count:,} runs")
+    print(f"validation only: {validated:.2f}s")
+    print(f"full import:     {stats['seconds']:.2f}s, {stats['rows']:,} rows ({stats['rows_per_second']:,.0f} rows/s)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--runs', type=int, default=2000, help="Number of map runs to insert")
+    arg_parser.add_argument('--import-runs', type=int, default=100_000, help="Number of map runs to import from CSV")
+    args = arg_parser.parse_args()
+
+    setups = [
+        ('rollback journal', RollbackJournalDatabase, False),
+        ('WAL', Database, False),
+        ('WAL + transaction', Database, True)
+    ]
+    print(f"Inserting {args.runs:,} runs with {len(ITEMS)} items each")
+    print(f"\n{'setup':<20}{'seconds':>10}{'runs/s':>12}{'speedup':>10}")
+    base = None
+    for name, database_class, batched in setups:
+        elapsed = bench(database_class, args.runs, batched)
+        base = base or elapsed
+        print(f"{name:<20}{elapsed:>10.3f}{args.runs / elapsed:>12,.0f}{base / elapsed:>10.2f}")
+    bench_import(args.import_runs)
+
+
+if __name__ == '__main__':
+    main()
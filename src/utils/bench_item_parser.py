@@ -0,0 +1,127 @@
+"""Benchmark ItemParser.parse_items on a large clipboard dump.
+
+Usage:
+    python src/utils/bench_item_parser.py [--items N] [--repeat N]
+
+The dump mixes currency, waystones, gems and rare, magic and unique
+equipment, the way a stash tab copied item by item looks. Every rare gets
+its own name so base types have to be read from the right block.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.item_parser import ItemParser
+
+
+TEMPLATES = [
+    """Item Class: Stackable Currency
+Rarity: Currency
+Exalted Orb
+--------
+Stack Size: {stack}/20
+--------
+Augments a Rare item with a new random modifier""",
+    """Item Class: Waystones
+Rarity: Normal
+Waystone (Tier {tier})
+--------
+Waystone Tier: {tier}
+--------
+Item Level: {level}""",
+    """Item Class: Gems
+Rarity: Currency
+Uncut Skill Gem
+--------
+Level: {tier}
+--------
+Creates a Skill Gem or Level an existing gem to level {tier}""",
+    """Item Class: Rings
+Rarity: Rare
+Dusk Loop {index}
+Gold Ring
+--------
+Item Level: {level}
+--------
++{stack}% to Fire Resistance""",
+    """Item Class: Amulets
+Rarity: Rare
+Vortex Beads {index}
+Lunar Amulet
+--------
+Item Level: {level}
+--------
++{stack} to maximum Life""",
+    """Item Class: Bows
+Rarity: Rare
+Storm Fletch {index}
+Recurve Bow
+--------
+Physical Damage: 10-20
+--------
+Item Level: {level}""",
+    """Item Class: Jewels
+Rarity: Rare
+Luminous Stone {index}
+Emerald
+--------
+Item Level: {level}""",
+    """Item Class: Boots
+Rarity: Rare
+Storm Stride {index}
+Advanced Embossed Boots
+--------
+Armour: 120
+--------
+Item Level: {level}""",
+    """Item Class: Boots
+Rarity: Magic
+Runner's Embossed Boots of the Fox
+--------
+Armour: 80
+--------
+Item Level: {level}""",
+    """Item Class: Quarterstaves
+Rarity: Unique
+The Sentry
+Gothic Quarterstaff
+--------
+Item Level: {level}"""
+]
+
+
+def generate_dump(count):
+    blocks = []
+    for i in range(count):
+        template = TEMPLATES[i % len(TEMPLATES)]
+        blocks.append(template.format(index=i, stack=1 + i % 20, tier=1 + i % 16, level=65 + i % 17))
+    return '\n\n'.join(blocks)
+
+
+def bench(text, repeat):
+    best = None
+    for _ in range(repeat):
+        parser = ItemParser()
+        started = time.perf_counter()
+        items = parser.parse_items(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(items)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--items', type=int, default=500, help="Number of items in the dump")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Runs to take the best time of")
+    args = arg_parser.parse_args()
+
+    text = generate_dump(args.items)
+    print(f"Parsing a dump of {args.items:,} items ({len(text.splitlines()):,} lines)")
+    elapsed, grouped = bench(text, args.repeat)
+    print(f"best of {args.repeat}: {elapsed * 1000:.1f} ms, {args.items / elapsed:,.0f} items/s, {grouped} grouped items")
+
+
+if __name__ == '__main__':
+    main()
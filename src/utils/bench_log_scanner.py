@@ -0,0 +1,79 @@
+"""Benchmark parallel Client.txt scanning against the sequential LogParser path.
+
+Usage:
+    python src/utils/bench_log_scanner.py [path/to/Client.txt] [--lines N] [--max-workers N]
+
+Without a path, a synthetic log in the Client.txt format is generated first.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.log_parser import LogParser
+from src.utils.log_scanner import scan_log_parallel
+
+FILLER_LINE = '2025/01/30 18:03:45 3802609 2caa1679 [INFO Client 25000] [SHADER] Delay: ON, loading shader cache entry\n'
+AREAS = ['MapHiddenGrotto', 'HideoutFelled', 'MapHiddenGrotto', 'MapCrimsonTemple_NoBoss', 'G1_town',
+         'MapUberBoss_IronCitadel', 'BreachDomain_01', 'MapMesa', 'HideoutFelled']
+
+
+def write_synthetic_log(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(lines):
+            if i % 200 == 0:
+                minute, second = divmod(i // 200, 60)
+                area = AREAS[(i // 200) % len(AREAS)]
+                f.write(f'2025/01/30 {18 + minute // 60 % 6:02d}:{minute % 60:02d}:{second:02d} 3802609 2caa1679 '
+                        f'[DEBUG Client 25000] Generating level 65 area "{area}" with seed {i}\n')
+            else:
+                f.write(FILLER_LINE)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('log_path', nargs='?')
+    arg_parser.add_argument('--lines', type=int, default=5_000_000, help="Lines in the synthetic log")
+    arg_parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args()
+
+    temp_path = None
+    log_path = args.log_path
+    if not log_path:
+        fd, temp_path = tempfile.mkstemp(suffix='_Client.txt')
+        os.close(fd)
+        print(f"Generating {args.lines:,} line synthetic log...")
+        write_synthetic_log(temp_path, args.lines)
+        log_path = temp_path
+
+    try:
+        size_mb = os.path.getsize(log_path) / 1024 / 1024
+        print(f"Log: {log_path} ({size_mb:.1f} MB)\n")
+
+        sequential, base = timed(lambda: list(LogParser(log_path).scan_history()))
+        print(f"{'mode':<14}{'seconds':>10}{'MB/s':>10}{'speedup':>10}  identical")
+        print(f"{'sequential':<14}{base:>10.3f}{size_mb / base:>10.1f}{1.0:>10.2f}  -")
+
+        workers = 1
+        while workers <= args.max_workers:
+            events, elapsed = timed(lambda: list(scan_log_parallel(log_path, workers)))
+            print(f"{f'{workers} worker(s)':<14}{elapsed:>10.3f}{size_mb / elapsed:>10.1f}"
+                  f"{base / elapsed:>10.2f}  {events == sequential}")
+            workers *= 2
+        print(f"\n{len(sequential):,} events")
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+
+
+if __name__ == '__main__':
+    main()
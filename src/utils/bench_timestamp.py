@@ -0,0 +1,62 @@
+"""Benchmark log timestamp decoding against datetime.strptime.
+
+Usage:
+    python src/utils/bench_timestamp.py [--lines N]
+
+Lines are generated in the same format as debug_log_parser.py writes,
+spread over a month so the per-day cache sees realistic day changes.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.log_parser import LogParser, parse_log_timestamp
+
+
+def generate_lines(count):
+    lines = []
+    for i in range(count):
+        seconds = i * 3  # About 3 seconds between lines, roughly a month for a million lines
+        day, rest = divmod(seconds, 86400)
+        hour, rest = divmod(rest, 3600)
+        minute, second = divmod(rest, 60)
+        lines.append(f'2025/01/{1 + day % 28:02d} {hour:02d}:{minute:02d}:{second:02d} 3802609 2caa1679 '
+                     f'[DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed {1681684543 + i}\n')
+    return lines
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--lines', type=int, default=1_000_000, help="Number of log lines")
+    args = arg_parser.parse_args()
+
+    print(f"Generating {args.lines:,} log lines...")
+    lines = generate_lines(args.lines)
+    stamps = [line[:19] for line in lines]
+
+    expected, base = timed(lambda: [datetime.strptime(stamp, '%Y/%m/%d %H:%M:%S') for stamp in stamps])
+    fast, elapsed = timed(lambda: [parse_log_timestamp(stamp) for stamp in stamps])
+    print(f"\n{'decoder':<22}{'seconds':>10}{'ns/line':>10}{'speedup':>10}")
+    print(f"{'strptime':<22}{base:>10.3f}{base / len(stamps) * 1e9:>10.0f}{1.0:>10.2f}")
+    print(f"{'parse_log_timestamp':<22}{elapsed:>10.3f}{elapsed / len(stamps) * 1e9:>10.0f}{base / elapsed:>10.2f}")
+    print(f"identical: {fast == expected}")
+
+    # Whole line parsing, where the timestamp used to dominate
+    parser = LogParser(os.devnull)  # Only parse_line is used
+    events, elapsed = timed(lambda: [parser.parse_line(line) for line in lines])
+    print(f"\nparse_line: {elapsed:.3f}s ({len(lines) / elapsed:,.0f} lines/s), "
+          f"timestamps match: {[event.timestamp for event in events] == expected}")
+
+
+if __name__ == '__main__':
+    main()
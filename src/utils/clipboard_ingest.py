@@ -0,0 +1,64 @@
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ClipboardIngestor:
+    """Parses copied item text off the UI thread and keeps running totals by item name
+
+    feed() hashes the clipboard text and skips it when it is the same as the
+    last copy, so pressing Ctrl+C on an item again (or the game setting the
+    clipboard twice) is only counted once. New text is parsed on a worker
+    thread. on_ready is called from that thread when a parse finishes.
+    drain() then merges the finished parses, in the order they were copied,
+    on the caller's thread.
+    """
+    def __init__(self, item_parser, on_ready=None):
+        self.item_parser = item_parser
+        self.on_ready = on_ready
+        self.items = {}  # Item name -> item with the total stack size, in the order first copied
+        self._last_digest = None
+        self._pending = deque()  # Futures of parses not merged yet, oldest first
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ClipboardParser')
+
+    def feed(self, text):
+        """Queue clipboard text for parsing, return False when it was skipped"""
+        if not text:
+            return False
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        if digest == self._last_digest:
+            return False
+        self._last_digest = digest
+        future = self._executor.submit(self.item_parser.parse_items, text)
+        self._pending.append(future)
+        if self.on_ready:
+            future.add_done_callback(lambda _: self.on_ready())
+        return True
+
+    def drain(self, wait=False):
+        """Merge finished parses into items and return the names that changed
+
+        With wait, parses still running are waited for as well.
+        """
+        changed = []
+        while self._pending and (wait or self._pending[0].done()):
+            future = self._pending.popleft()
+            try:
+                new_items = future.result()
+            except Exception as e:
+                print(f"Error parsing clipboard items: {e}")
+                continue
+            for new_item in new_items:
+                name = new_item['name']
+                item = self.items.get(name)
+                if item is None:
+                    self.items[name] = dict(new_item)
+                else:
+                    item['stack_size'] += new_item['stack_size']
+                changed.append(name)
+        return changed
+
+    def stop(self):
+        """Stop the worker thread, parses not drained yet are dropped"""
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
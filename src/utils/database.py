@@ -1,15 +1,121 @@
 import sqlite3
 import csv
+import re
+import time
+from contextlib import contextmanager
 from datetime import datetime
 import json
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect('poe2_maps.db')
+    MECHANICS = ('breach', 'delirium', 'expedition', 'ritual')
+    # Columns query_runs can sort by
+    SORT_COLUMNS = ('start_time', 'duration', 'map_level', 'map_name', 'boss_count', 'breach_count')
+    ITEM_LOOKUP_BATCH = 500  # Runs whose items are looked up by id rather than read in full
+    # Secondary indexes: the run list's filter and sort paths and item lookups
+    INDEXES = {
+        'idx_map_runs_start_time': 'ON map_runs (start_time)',
+        'idx_map_runs_character': 'ON map_runs (character_id, start_time)',
+        'idx_map_runs_build': 'ON map_runs (build_id, start_time)',
+        # Most runs have no mechanics, so these partial indexes stay small
+        **{f'idx_map_runs_{mechanic}': f'ON map_runs (start_time) WHERE has_{mechanic} = 1' for mechanic in MECHANICS},
+        'idx_map_run_items_item': 'ON map_run_items (item_name_id, run_id)'
+    }
+    EXPORT_BATCH = 1000  # Rows fetched at a time while exporting
+    # pyarrow type for each declared SQLite column type, anything else is exported as a string
+    ARROW_TYPES = {'INTEGER': 'int64', 'REAL': 'float64', 'BOOLEAN': 'bool_', 'TEXT': 'string'}
+    CSV_IMPORT_BATCH = 5000  # Rows per executemany when importing CSV backups
+    CSV_IMPORT_MAX_ERRORS = 20  # Problems listed before a CSV import gives up
+    # One "Name xN" entry of the Items column written by export_to_csv
+    CSV_ITEM_PATTERN = re.compile(r'(.+?) x(\d+)(?:, |$)')
+    # Per-run totals kept on map_runs for the most common currencies, item name -> column
+    SUMMARY_CURRENCIES = {
+        'Exalted Orb_Currency': 'exalted_orbs',
+        'Divine Orb_Currency': 'divine_orbs',
+        'Chaos Orb_Currency': 'chaos_orbs',
+        'Regal Orb_Currency': 'regal_orbs'
+    }
+    # item_count counts distinct real items, total_stack adds up their stack sizes
+    SUMMARY_COLUMNS = ('item_count', 'total_stack') + tuple(SUMMARY_CURRENCIES.values())
+    # run_rollups holds run totals per combination of these keys, kept up to
+    # date by triggers on map_runs. Expressions are written for one run row
+    # ({row} is NEW, OLD or map_runs). Missing values become 0 or '' so they
+    # still group together.
+    ROLLUP_KEYS = {
+        'day': "IFNULL(date({row}.start_time), '')",
+        'map_name': "IFNULL({row}.map_name, '')",
+        'map_level': "IFNULL({row}.map_level, 0)",
+        'character_id': "IFNULL({row}.character_id, 0)",
+        'build_id': "IFNULL({row}.build_id, 0)",
+        # Bit i set when the run had MECHANICS[i]
+        'mechanics': ' | '.join(f"((IFNULL({{row}}.has_{mechanic}, 0) != 0) << {bit})"
+                                for bit, mechanic in enumerate(MECHANICS))
+    }
+    ROLLUP_TRIGGERS = ('map_runs_rollup_insert', 'map_runs_rollup_delete', 'map_runs_rollup_update')
+    ROLLUP_SUMS = {
+        'runs': "1",
+        'completed': "({row}.completion_status = 'complete')",
+        'rips': "({row}.completion_status = 'rip')",
+        'duration_sum': "IFNULL({row}.duration, 0)",
+        'boss_sum': "IFNULL({row}.boss_count, 0)",
+        'breach_sum': "IFNULL({row}.breach_count, 0)",
+        **{column: f"IFNULL({{row}}.{column}, 0)" for column in SUMMARY_COLUMNS}
+    }
+    # Connection profile. WAL lets readers run alongside a write and, with
+    # synchronous=NORMAL, a commit no longer waits on an fsync.
+    PRAGMAS = (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -16000),  # Negative is KiB, so 16 MB
+        ('mmap_size', 64 * 1024 * 1024),
+        ('temp_store', 'MEMORY'),
+    )
+    
+    def __init__(self, db_path='poe2_maps.db'):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        for name, value in self.PRAGMAS:
+            self.conn.execute(f"PRAGMA {name} = {value}")
+        self._transaction_depth = 0
         cursor = self.conn.cursor()
+        self._item_name_ids = {}  # item name -> item_names.id
+        # Identity maps for get_character/get_build, id -> row dict
+        self._characters = {}
+        self._builds = {}
         self.create_tables()
         self.update_schema()
         
+    @contextmanager
+    def transaction(self):
+        """Commit every write made inside the block once, at the end.
+        
+        Database methods called inside the block skip their own commit. The
+        outermost block commits, or rolls back everything if an exception
+        escapes it. Blocks can be nested. The outermost block starts the
+        transaction explicitly, because sqlite3 only begins one by itself
+        before INSERT/UPDATE/DELETE and would commit DDL such as DROP INDEX
+        straight away.
+        """
+        if not self._transaction_depth and not self.conn.in_transaction:
+            self.conn.execute('BEGIN')
+        self._transaction_depth += 1
+        try:
+            yield
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self.conn.rollback()
+                # Rows cached inside the block may have been rolled back
+                self._clear_caches()
+            raise
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self.conn.commit()
+            
+    def _commit(self):
+        """Commit, unless a transaction() block will commit for us"""
+        if not self._transaction_depth:
+            self.conn.commit()
+            
     def update_schema(self):
         """Update database schema for existing databases"""
         cursor = self.conn.cursor()
@@ -45,6 +151,39 @@ class Database:
                 cursor.execute('ALTER TABLE builds_new RENAME TO builds')
                 
                 self.conn.commit()
+                
+        self.create_indexes()
+        
+        # Summary columns, filled in from map_run_items when first added
+        cursor.execute("PRAGMA table_info(map_runs)")
+        columns = [col[1] for col in cursor.fetchall()]
+        missing = [column for column in self.SUMMARY_COLUMNS if column not in columns]
+        if missing:
+            try:
+                for column in missing:
+                    cursor.execute(f"ALTER TABLE map_runs ADD COLUMN {column} INTEGER DEFAULT 0")
+                self._update_summaries(cursor)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        
+        self.create_rollups()
+        
+        # Move items still stored as JSON in map_runs.items into map_run_items
+        cursor.execute("SELECT id, items FROM map_runs WHERE items IS NOT NULL")
+        legacy_runs = cursor.fetchall()
+        if legacy_runs:
+            try:
+                for run_id, items_json in legacy_runs:
+                    items = json.loads(items_json) if items_json else []
+                    self._insert_items(cursor, run_id, [item for item in items if isinstance(item, dict)])
+                self._update_summaries(cursor, [run_id for run_id, _ in legacy_runs])
+                cursor.execute("UPDATE map_runs SET items = NULL WHERE items IS NOT NULL")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
         
     def create_tables(self):
         cursor = self.conn.cursor()
@@ -102,8 +241,227 @@ class Database:
                 FOREIGN KEY (build_id) REFERENCES builds (id)
             )
         ''')
+        
+        # 4. Loot, one row per item name per run. map_runs.items is only read
+        # to migrate older databases.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS item_names (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS map_run_items (
+                id INTEGER PRIMARY KEY,
+                run_id INTEGER NOT NULL,
+                item_name_id INTEGER NOT NULL,
+                item_class TEXT,
+                rarity TEXT,
+                stack_size INTEGER DEFAULT 1,
+                UNIQUE (run_id, item_name_id),
+                FOREIGN KEY (run_id) REFERENCES map_runs (id) ON DELETE CASCADE,
+                FOREIGN KEY (item_name_id) REFERENCES item_names (id)
+            )
+        ''')
         self.conn.commit()
         
+    def create_indexes(self):
+        """Create the INDEXES, also added to existing databases"""
+        cursor = self.conn.cursor()
+        for name, definition in self.INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} {definition}')
+        self._commit()
+        
+    def drop_indexes(self):
+        """Drop the INDEXES, so a bulk load does not update them row by row"""
+        cursor = self.conn.cursor()
+        for name in self.INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+        
+    def create_rollups(self, rebuild=False):
+        """Create run_rollups and the triggers that maintain it, filling it in if new or rebuild"""
+        cursor = self.conn.cursor()
+        keys = ', '.join(self.ROLLUP_KEYS)
+        sums = ', '.join(self.ROLLUP_SUMS)
+        
+        def expressions(columns, row):
+            return ', '.join(expression.format(row=row) for expression in columns.values())
+            
+        def add(row):
+            updates = ', '.join(f"{name} = {name} + excluded.{name}" for name in self.ROLLUP_SUMS)
+            return f'''
+                INSERT INTO run_rollups ({keys}, {sums})
+                VALUES ({expressions(self.ROLLUP_KEYS, row)}, {expressions(self.ROLLUP_SUMS, row)})
+                ON CONFLICT ({keys}) DO UPDATE SET {updates};
+            '''
+            
+        def subtract(row):
+            match = ' AND '.join(f"{name} = {expression.format(row=row)}"
+                                 for name, expression in self.ROLLUP_KEYS.items())
+            updates = ', '.join(f"{name} = {name} - {expression.format(row=row)}"
+                                for name, expression in self.ROLLUP_SUMS.items())
+            return f'''
+                UPDATE run_rollups SET {updates} WHERE {match};
+                DELETE FROM run_rollups WHERE runs = 0 AND {match};
+            '''
+            
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='run_rollups'")
+        exists = cursor.fetchone() is not None
+        with self.transaction():
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS run_rollups (
+                    day TEXT NOT NULL,
+                    map_name TEXT NOT NULL,
+                    map_level INTEGER NOT NULL,
+                    character_id INTEGER NOT NULL,
+                    build_id INTEGER NOT NULL,
+                    mechanics INTEGER NOT NULL,
+                    {', '.join(f"{name} INTEGER NOT NULL DEFAULT 0" for name in self.ROLLUP_SUMS)},
+                    PRIMARY KEY ({keys})
+                )
+            ''')
+            if not exists or rebuild:
+                cursor.execute('DELETE FROM run_rollups')
+                cursor.execute(f'''
+                    INSERT INTO run_rollups ({keys}, {sums})
+                    SELECT {expressions(self.ROLLUP_KEYS, 'map_runs')},
+                           {', '.join(f"SUM({expression.format(row='map_runs')})" for expression in self.ROLLUP_SUMS.values())}
+                    FROM map_runs
+                    GROUP BY {', '.join(str(i + 1) for i in range(len(self.ROLLUP_KEYS)))}
+                ''')
+            # Only changes to columns the rollups read touch them
+            columns = ('start_time', 'map_name', 'map_level', 'character_id', 'build_id', 'completion_status',
+                       'duration', 'boss_count', 'breach_count') + tuple(f'has_{mechanic}' for mechanic in self.MECHANICS)
+            # One statement at a time, executescript would commit the transaction
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS map_runs_rollup_insert AFTER INSERT ON map_runs
+                BEGIN {add('NEW')} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS map_runs_rollup_delete AFTER DELETE ON map_runs
+                BEGIN {subtract('OLD')} END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS map_runs_rollup_update
+                AFTER UPDATE OF {', '.join(columns + self.SUMMARY_COLUMNS)} ON map_runs
+                BEGIN {subtract('OLD')} {add('NEW')} END
+            ''')
+            
+    def drop_rollup_triggers(self):
+        """Stop maintaining run_rollups row by row, for bulk loads followed by create_rollups(rebuild=True)"""
+        cursor = self.conn.cursor()
+        for trigger in self.ROLLUP_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            
+    @staticmethod
+    def is_real_item(name):
+        """False for placeholder and header lines the item parser can produce instead of a name"""
+        return (name != 'Unknown Item' and
+                not name.startswith('Item Class:') and
+                not name.startswith('Stack Size:') and
+                not name.startswith('Rarity:'))
+        
+    def _item_name_id(self, cursor, name):
+        """Id of an item name in item_names, adding it if new"""
+        name_id = self._item_name_ids.get(name)
+        if name_id is None:
+            cursor.execute('INSERT OR IGNORE INTO item_names (name) VALUES (?)', (name,))
+            cursor.execute('SELECT id FROM item_names WHERE name = ?', (name,))
+            name_id = self._item_name_ids[name] = cursor.fetchone()[0]
+        return name_id
+        
+    # Adds stack sizes onto an item the run already has
+    INSERT_ITEM_SQL = '''
+        INSERT INTO map_run_items (run_id, item_name_id, item_class, rarity, stack_size)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (run_id, item_name_id) DO UPDATE SET stack_size = stack_size + excluded.stack_size
+    '''
+    
+    def _insert_items(self, cursor, run_id, items):
+        """Add items to a run, adding stack sizes onto items it already has"""
+        cursor.executemany(self.INSERT_ITEM_SQL, [
+            (run_id, self._item_name_id(cursor, item.get('name', 'Unknown')), item.get('item_class'),
+             item.get('rarity'), item.get('stack_size', 1))
+            for item in items
+        ])
+        
+    def _update_summaries(self, cursor, run_ids=None):
+        """Recompute the SUMMARY_COLUMNS of the given runs, or of every run, from map_run_items"""
+        if run_ids is None:
+            cursor.execute('SELECT id FROM map_runs')
+            run_ids = [row[0] for row in cursor.fetchall()]
+            run_filter, params = '', ()
+        else:
+            run_ids = list(run_ids)
+            if not run_ids:
+                return
+            if len(run_ids) > self.ITEM_LOOKUP_BATCH:
+                # Stay under SQLite's limit on query parameters
+                for start in range(0, len(run_ids), self.ITEM_LOOKUP_BATCH):
+                    self._update_summaries(cursor, run_ids[start:start + self.ITEM_LOOKUP_BATCH])
+                return
+            run_filter, params = f"WHERE i.run_id IN ({', '.join('?' * len(run_ids))})", run_ids
+        run_items = {run_id: {} for run_id in run_ids}
+        cursor.execute(f'''
+            SELECT i.run_id, n.name, i.stack_size
+            FROM map_run_items i
+            JOIN item_names n ON n.id = i.item_name_id
+            {run_filter}
+        ''', params)
+        for run_id, name, stack_size in cursor.fetchall():
+            if run_id in run_items:
+                run_items[run_id][name] = stack_size
+        cursor.executemany(
+            f"UPDATE map_runs SET {', '.join(f'{column} = ?' for column in self.SUMMARY_COLUMNS)} WHERE id = ?",
+            [self._summarize(items) + [run_id] for run_id, items in run_items.items()]
+        )
+        
+    def _summarize(self, items):
+        """SUMMARY_COLUMNS values of one run from its {item name: stack size}"""
+        summary = dict.fromkeys(self.SUMMARY_COLUMNS, 0)
+        for name, stack_size in items.items():
+            if not self.is_real_item(name):
+                continue
+            stack_size = stack_size or 0
+            summary['item_count'] += 1
+            summary['total_stack'] += stack_size
+            column = self.SUMMARY_CURRENCIES.get(name)
+            if column:
+                summary[column] += stack_size
+        return [summary[column] for column in self.SUMMARY_COLUMNS]
+        
+    def _attach_items(self, cursor, runs, run_filter=None, params=()):
+        """Fill in each run's 'items' list from map_run_items, in the order they were added
+        
+        run_filter optionally limits the item rows read, e.g. to one character's runs.
+        Without one, a page of runs has its items looked up by run id.
+        """
+        by_id = {run['id']: run for run in runs}
+        for run in runs:
+            run['items'] = []
+        if not by_id:
+            return runs
+        if run_filter is None and len(by_id) <= self.ITEM_LOOKUP_BATCH:
+            run_filter = f"WHERE i.run_id IN ({', '.join('?' * len(by_id))})"
+            params = tuple(by_id)
+        cursor.execute(f'''
+            SELECT i.run_id, n.name, i.stack_size, i.rarity, i.item_class
+            FROM map_run_items i
+            JOIN item_names n ON n.id = i.item_name_id
+            {run_filter or ''}
+            ORDER BY i.id
+        ''', params)
+        for run_id, name, stack_size, rarity, item_class in cursor.fetchall():
+            run = by_id.get(run_id)
+            if run is not None:
+                run['items'].append({
+                    'name': name,
+                    'stack_size': stack_size,
+                    'rarity': rarity,
+                    'item_class': item_class
+                })
+        return runs
+        
     def add_map_run(self, map_name, map_level, boss_count, start_time, duration, items, completion_status='complete',
                     has_breach=False, has_delirium=False, has_expedition=False, has_ritual=False, breach_count=0, character_id=None):
         cursor = self.conn.cursor()
@@ -117,112 +475,306 @@ class Database:
                 
         cursor.execute('''
             INSERT INTO map_runs (
-                map_name, map_level, boss_count, start_time, duration, items, value, completion_status,
+                map_name, map_level, boss_count, start_time, duration, value, completion_status,
                 has_breach, has_delirium, has_expedition, has_ritual, breach_count, character_id, build_id
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (map_name, map_level, boss_count, start_time, duration, json.dumps(items), 0, completion_status,
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (map_name, map_level, boss_count, start_time, duration, 0, completion_status,
               has_breach, has_delirium, has_expedition, has_ritual, breach_count, character_id, build_id))
-        self.conn.commit()
+        run_id = cursor.lastrowid
+        if items:
+            real_items = [item for item in items if self.is_real_item(item.get('name', 'Unknown'))]
+            self._insert_items(cursor, run_id, real_items)
+            self._update_summaries(cursor, [run_id])
+        self._commit()
+        return run_id
+        
+    def add_map_runs(self, runs, character_id=None):
+        """Bulk insert reconstructed runs in a single transaction.
+        
+        runs is an iterable of dicts with map_name, map_level, has_boss, start_time,
+        duration and optionally completion_status, consumed lazily so it can
+        stream from a generator. Runs already stored with the same map name and
+        start time are skipped. Returns the number of runs inserted.
+        """
+        cursor = self.conn.cursor()
+        build_id = None
+        if character_id:
+            cursor.execute('SELECT current_build_id FROM characters WHERE id = ?', (character_id,))
+            result = cursor.fetchone()
+            if result:
+                build_id = result[0]
+                
+        rows = (
+            (run['map_name'], run['map_level'], 0, run['start_time'], run['duration'],
+             0, run.get('completion_status', 'complete'), character_id, build_id,
+             run['map_name'], run['start_time'])
+            for run in runs
+        )
+        with self.transaction():
+            cursor.executemany('''
+                INSERT INTO map_runs (
+                    map_name, map_level, boss_count, start_time, duration, value,
+                    completion_status, character_id, build_id
+                )
+                SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM map_runs WHERE map_name = ? AND start_time = ?
+                )
+            ''', rows)
+        return cursor.rowcount
         
     def add_items_to_map(self, map_id, items):
         cursor = self.conn.cursor()
-        cursor.execute('SELECT items FROM map_runs WHERE id = ?', (map_id,))
-        result = cursor.fetchone()
-        if result:
-            existing_items = json.loads(result[0]) if result[0] else []
-            # Combine items by name
-            items_dict = {}
-            
-            # Process existing items
-            for item in existing_items:
-                name = item.get('name', 'Unknown')
-                if (name != 'Unknown Item' and 
-                    not name.startswith('Item Class:') and 
-                    not name.startswith('Stack Size:') and 
-                    not name.startswith('Rarity:')):
-                    if name in items_dict:
-                        items_dict[name]['stack_size'] += item.get('stack_size', 1)
-                    else:
-                        items_dict[name] = {
-                            'name': name,
-                            'stack_size': item.get('stack_size', 1),
-                            'rarity': item.get('rarity'),
-                            'item_class': item.get('item_class')
-                        }
-            
-            # Add new items, combining if they already exist
-            for item in items:
-                name = item.get('name', 'Unknown')
-                if (name != 'Unknown Item' and 
-                    not name.startswith('Item Class:') and 
-                    not name.startswith('Stack Size:') and 
-                    not name.startswith('Rarity:')):
-                    if name in items_dict:
-                        items_dict[name]['stack_size'] += item.get('stack_size', 1)
-                    else:
-                        items_dict[name] = {
-                            'name': name,
-                            'stack_size': item.get('stack_size', 1),
-                            'rarity': item.get('rarity'),
-                            'item_class': item.get('item_class')
-                        }
-            
-            # Convert back to list and save
-            combined_items = list(items_dict.values())
-            cursor.execute('UPDATE map_runs SET items = ? WHERE id = ?',
-                         (json.dumps(combined_items), map_id))
-            self.conn.commit()
+        cursor.execute('SELECT 1 FROM map_runs WHERE id = ?', (map_id,))
+        if cursor.fetchone():
+            # Items already on the run are combined by name
+            real_items = [item for item in items if self.is_real_item(item.get('name', 'Unknown'))]
+            self._insert_items(cursor, map_id, real_items)
+            self._update_summaries(cursor, [map_id])
+            self._commit()
             
     def add_items_to_latest_map(self, items):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT id FROM map_runs ORDER BY start_time DESC LIMIT 1')
-        result = cursor.fetchone()
-        if result:
-            self.add_items_to_map(result[0], items)
+        with self.transaction():
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT id FROM map_runs ORDER BY start_time DESC LIMIT 1')
+            result = cursor.fetchone()
+            if result:
+                self.add_items_to_map(result[0], items)
             
     def delete_map_run(self, map_id):
         cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM map_run_items WHERE run_id = ?', (map_id,))
         cursor.execute('DELETE FROM map_runs WHERE id = ?', (map_id,))
-        self.conn.commit()
+        self._commit()
         
     def get_map_runs(self):
+        return self.query_runs()
+        
+    def _run_filter_sql(self, filters):
+        """WHERE clause and parameters for query_runs/run_stats filters"""
+        conditions = []
+        params = []
+        for key in ('character_id', 'build_id', 'map_name', 'map_level', 'completion_status'):
+            if filters.get(key) is not None:
+                conditions.append(f"r.{key} = ?")
+                params.append(filters[key])
+        for mechanic in filters.get('mechanics') or ():
+            if mechanic not in self.MECHANICS:
+                raise ValueError(f"Unknown mechanic: {mechanic}")
+            # Written as "= 1" so the partial mechanic indexes apply
+            conditions.append(f"r.has_{mechanic} = 1")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+        
+    def query_runs(self, filters=None, order='start_time DESC', limit=None, offset=0, with_items=True):
+        """Map runs matching filters, sorted and paged in SQL
+        
+        filters may hold character_id, build_id, map_name, map_level,
+        completion_status and mechanics (names from MECHANICS that must all be
+        present). order is one of SORT_COLUMNS, optionally followed by ASC or
+        DESC. Each run comes with the display fields of its character and
+        build (character_name, character_level, character_class,
+        character_ascendancy, build_name, build_url), joined in the same
+        query, its SUMMARY_COLUMNS and, unless with_items is False, its
+        'items' list.
+        """
+        column, _, direction = order.partition(' ')
+        direction = direction.strip().upper() or 'ASC'
+        if column not in self.SORT_COLUMNS or direction not in ('ASC', 'DESC'):
+            raise ValueError(f"Unsupported order: {order}")
+        where, params = self._run_filter_sql(filters or {})
+        # id breaks ties so pages never overlap or skip runs
+        query = f'''
+            SELECT r.*,
+                   c.name AS character_name, c.level AS character_level,
+                   c.class AS character_class, c.ascendancy AS character_ascendancy,
+                   b.name AS build_name, b.url AS build_url
+            FROM map_runs r
+            LEFT JOIN characters c ON c.id = r.character_id
+            LEFT JOIN builds b ON b.id = r.build_id
+            {where}
+            ORDER BY r.{column} {direction}, r.id {direction}
+        '''
+        query_params = list(params)
+        if limit is not None:
+            query += ' LIMIT ? OFFSET ?'
+            query_params += [limit, offset]
+        
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM map_runs ORDER BY start_time DESC')
+        cursor.execute(query, query_params)
         columns = [description[0] for description in cursor.description]
-        runs = []
+        runs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if not with_items:
+            return runs
+        if limit is None and where:
+            # Only read the items of the filtered runs
+            return self._attach_items(cursor, runs, f"WHERE i.run_id IN (SELECT r.id FROM map_runs r {where})", params)
+        return self._attach_items(cursor, runs)
+        
+    def rollup_stats(self, group_by=(), filters=None):
+        """Run totals from run_rollups, one dict per group of the group_by keys
+        
+        group_by names ROLLUP_KEYS to keep, totals are summed over the rest.
+        filters may hold values for any ROLLUP_KEYS except mechanics, plus
+        mechanics as a list of MECHANICS names that must all be present. Each
+        dict has its group_by keys, the ROLLUP_SUMS, max_level and
+        avg_duration. Runs without a character or build have id 0.
+        """
+        filters = dict(filters or {})
+        for key in group_by:
+            if key not in self.ROLLUP_KEYS:
+                raise ValueError(f"Unknown rollup key: {key}")
+        conditions = []
+        params = []
+        mask = 0
+        for mechanic in filters.pop('mechanics', None) or ():
+            if mechanic not in self.MECHANICS:
+                raise ValueError(f"Unknown mechanic: {mechanic}")
+            mask |= 1 << self.MECHANICS.index(mechanic)
+        if mask:
+            conditions.append("mechanics & ? = ?")
+            params += [mask, mask]
+        for key, value in filters.items():
+            if key not in self.ROLLUP_KEYS or key == 'mechanics':
+                raise ValueError(f"Unknown rollup filter: {key}")
+            if value is not None:
+                conditions.append(f"{key} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        group = f"GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}" if group_by else ''
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT {''.join(f'{key}, ' for key in group_by)}
+                   {', '.join(f'SUM({name})' for name in self.ROLLUP_SUMS)},
+                   MAX(map_level)
+            FROM run_rollups {where} {group}
+        ''', params)
+        stats = []
         for row in cursor.fetchall():
-            run = dict(zip(columns, row))
-            run['items'] = json.loads(run['items']) if run['items'] else []
-            runs.append(run)
-        return runs
+            group_stats = dict(zip(tuple(group_by) + tuple(self.ROLLUP_SUMS) + ('max_level',), row))
+            if not group_stats['runs']:
+                continue  # Nothing matched
+            group_stats['avg_duration'] = group_stats['duration_sum'] / group_stats['runs']
+            stats.append(group_stats)
+        return stats
+        
+    def get_run_items(self, run_id):
+        """Items of one run, in the order they were added"""
+        cursor = self.conn.cursor()
+        return self._attach_items(cursor, [{'id': run_id}])[0]['items']
+        
+    def run_stats(self, filters=None):
+        """Totals for the runs matching filters, computed in one aggregate query"""
+        where, params = self._run_filter_sql(filters or {})
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT COUNT(*),
+                   COALESCE(SUM(completion_status = 'complete'), 0),
+                   COALESCE(SUM(completion_status = 'rip'), 0),
+                   COALESCE(SUM(boss_count = 1), 0),
+                   COALESCE(SUM(boss_count = 2), 0),
+                   COALESCE(AVG(duration), 0)
+            FROM map_runs r {where}
+        ''', params)
+        total, complete, rips, single_bosses, twin_bosses, avg_duration = cursor.fetchone()
+        return {
+            'total': total,
+            'complete': complete,
+            'rips': rips,
+            'single_bosses': single_bosses,
+            'twin_bosses': twin_bosses,
+            'avg_duration': avg_duration
+        }
+        
+    def get_item_totals(self, name_suffix=None):
+        """Total stack size of every item name over all runs, optionally only names ending in name_suffix"""
+        cursor = self.conn.cursor()
+        query = '''
+            SELECT n.name, SUM(i.stack_size)
+            FROM map_run_items i
+            JOIN item_names n ON n.id = i.item_name_id
+        '''
+        params = ()
+        if name_suffix:
+            query += ' WHERE substr(n.name, -?) = ?'
+            params = (len(name_suffix), name_suffix)
+        cursor.execute(query + ' GROUP BY i.item_name_id', params)
+        return dict(cursor.fetchall())
+        
+    def get_item_count_by_run(self, item_name):
+        """Total stack size of one item name per run, as {run_id: count} for runs that have it"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT i.run_id, SUM(i.stack_size)
+            FROM map_run_items i
+            JOIN item_names n ON n.id = i.item_name_id
+            WHERE n.name = ?
+            GROUP BY i.run_id
+        ''', (item_name,))
+        return dict(cursor.fetchall())
         
     def clear_database(self):
         """Clear all records from the database."""
         cursor = self.conn.cursor()
         # Delete in order of foreign key dependencies
+        cursor.execute('DELETE FROM map_run_items')
         cursor.execute('DELETE FROM map_runs')
         cursor.execute('DELETE FROM builds')
         cursor.execute('DELETE FROM characters')
-        self.conn.commit()
+        self._commit()
+        self._clear_caches()
         
-    def export_to_csv(self, file_path):
-        """Export all data to CSV files"""
-        cursor = self.conn.cursor()
+    def _clear_caches(self):
+        """Drop cached item name ids, characters and builds after changes the caches cannot follow"""
+        self._item_name_ids.clear()
+        self._characters.clear()
+        self._builds.clear()
         
+    def _iter_rows(self, query, params=()):
+        """Rows of a query as sqlite3.Row, fetched EXPORT_BATCH at a time"""
+        cursor = self.conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(self.EXPORT_BATCH)
+            if not rows:
+                return
+            yield from rows
+            
+    def _iter_runs(self):
+        """Every run as a dict with its 'items', by start time, ITEM_LOOKUP_BATCH runs in memory at a time"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT * FROM map_runs ORDER BY start_time, id')
+        columns = [description[0] for description in cursor.description]
+        item_cursor = self.conn.cursor()
+        while True:
+            # Small enough batches that _attach_items looks up their items by id
+            runs = [dict(zip(columns, row)) for row in cursor.fetchmany(self.ITEM_LOOKUP_BATCH)]
+            if not runs:
+                return
+            yield from self._attach_items(item_cursor, runs)
+            
+    def export_to_csv(self, file_path):
+        """Export all data to CSV files, streaming rows instead of loading whole tables"""
         # Export characters
         with open(file_path.replace('.csv', '_characters.csv'), 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['ID', 'Name', 'Level', 'Class', 'Ascendancy', 'Current Build ID'])
-            cursor.execute('SELECT * FROM characters ORDER BY id')
-            writer.writerows(cursor.fetchall())
+            writer.writerows(
+                (row['id'], row['name'], row['level'], row['class'], row['ascendancy'], row['current_build_id'])
+                for row in self._iter_rows('SELECT * FROM characters ORDER BY id')
+            )
             
         # Export builds
         with open(file_path.replace('.csv', '_builds.csv'), 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['ID', 'Character ID', 'Name', 'URL', 'Created At', 'Updated At'])
-            cursor.execute('SELECT * FROM builds ORDER BY id')
-            writer.writerows(cursor.fetchall())
+            writer.writerows(
+                (row['id'], row['character_id'], row['name'], row['url'], row['created_at'], row['updated_at'])
+                for row in self._iter_rows('SELECT * FROM builds ORDER BY id')
+            )
         
         # Export map runs
         with open(file_path.replace('.csv', '_maps.csv'), 'w', newline='', encoding='utf-8') as f:
@@ -232,150 +784,276 @@ class Database:
                 'Items', 'Status', 'Has Breach', 'Has Delirium', 'Has Expedition',
                 'Has Ritual', 'Breach Count', 'Character ID', 'Build ID'
             ])
-            
-            cursor.execute('SELECT * FROM map_runs ORDER BY start_time')
-            for row in cursor.fetchall():
-                # Format duration as MM:SS
-                duration_mins = row[5] // 60
-                duration_secs = row[5] % 60
-                duration_str = f"{duration_mins:02d}:{duration_secs:02d}"
-                
-                # Format items list
-                items = json.loads(row[6]) if row[6] else []
-                items_str = ", ".join(
-                    f"{item['name']} x{item['stack_size']}"
-                    for item in items
-                    if item['name'] != 'Unknown Item'
-                    and not item['name'].startswith('Item Class:')
-                    and not item['name'].startswith('Stack Size:')
-                    and not item['name'].startswith('Rarity:')
-                ) or "None"
-                
+            for run in self._iter_runs():
                 writer.writerow([
-                    row[0],  # ID
-                    row[1],  # Map Name
-                    row[2],  # Map Level
-                    row[3],  # Boss Count
-                    row[4],  # Start Time
-                    duration_str,
-                    items_str,
-                    'Complete' if row[8] == 'complete' else 'RIP',
-                    'Yes' if row[9] else 'No',  # Has Breach
-                    'Yes' if row[10] else 'No',  # Has Delirium
-                    'Yes' if row[11] else 'No',  # Has Expedition
-                    'Yes' if row[12] else 'No',  # Has Ritual
-                    row[13],  # Breach Count
-                    row[14],  # Character ID
-                    row[15]   # Build ID
+                    run['id'],
+                    run['map_name'],
+                    run['map_level'],
+                    run['boss_count'],
+                    run['start_time'],
+                    f"{run['duration'] // 60:02d}:{run['duration'] % 60:02d}",  # MM:SS
+                    ", ".join(f"{item['name']} x{item['stack_size']}" for item in run['items']
+                              if self.is_real_item(item['name'])) or "None",
+                    'Complete' if run['completion_status'] == 'complete' else 'RIP',
+                    'Yes' if run['has_breach'] else 'No',
+                    'Yes' if run['has_delirium'] else 'No',
+                    'Yes' if run['has_expedition'] else 'No',
+                    'Yes' if run['has_ritual'] else 'No',
+                    run['breach_count'],
+                    run['character_id'],
+                    run['build_id']
                 ])
-    
-    def import_from_csv(self, characters_file, maps_file, builds_file=None):
-        """Import data from CSV files"""
-        cursor = self.conn.cursor()
-        
-        # Begin transaction for deferred foreign key checks
-        cursor.execute('BEGIN DEFERRED')
+                
+    def export_to_parquet(self, file_path):
+        """Export all data to Parquet files for analysis, needs pyarrow
         
+        file_path ending in .parquet names the maps file, characters, builds
+        and items go next to it with _characters, _builds and _items
+        suffixes. Items are their own table with a run_id column instead of
+        a text column on each run. Returns the paths written.
+        """
         try:
-            # Import characters first (without current_build_id)
-            with open(characters_file, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    cursor.execute('''
-                        INSERT INTO characters (id, name, level, class, ascendancy)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        int(row['ID']),
-                        row['Name'],
-                        int(row['Level']),
-                        row['Class'],
-                        row['Ascendancy'] if row['Ascendancy'] != '' else None
-                    ))
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow, install it with: pip install pyarrow") from None
             
-            # Import builds if provided
+        base = file_path[:-len('.parquet')] if file_path.endswith('.parquet') else file_path
+        tables = {
+            f'{base}_maps.parquet': ('map_runs', 'SELECT * FROM map_runs ORDER BY start_time, id'),
+            f'{base}_items.parquet': ('map_run_items', '''
+                SELECT i.id, i.run_id, n.name, i.item_class, i.rarity, i.stack_size
+                FROM map_run_items i
+                JOIN item_names n ON n.id = i.item_name_id
+                ORDER BY i.run_id, i.id
+            '''),
+            f'{base}_characters.parquet': ('characters', 'SELECT * FROM characters ORDER BY id'),
+            f'{base}_builds.parquet': ('builds', 'SELECT * FROM builds ORDER BY id')
+        }
+        for path, (table, query) in tables.items():
+            # Column types come from the declared SQLite types, so empty tables keep their schema
+            declared = {row[1]: row[2].upper() for row in self.conn.execute(f'PRAGMA table_info({table})')}
+            declared.setdefault('name', 'TEXT')  # Items get their name from item_names
+            columns = [description[0] for description in self.conn.execute(f'SELECT * FROM ({query}) LIMIT 0').description]
+            schema = pa.schema([
+                (column, getattr(pa, self.ARROW_TYPES.get(declared.get(column), 'string'))())
+                for column in columns
+                if column != 'items'  # Legacy JSON column of map_runs
+            ])
+            with pq.ParquetWriter(path, schema) as writer:
+                batch = []
+                for row in self._iter_rows(query):
+                    batch.append(row)
+                    if len(batch) == self.EXPORT_BATCH:
+                        writer.write_batch(self._arrow_batch(pa, schema, batch))
+                        batch = []
+                if batch:
+                    writer.write_batch(self._arrow_batch(pa, schema, batch))
+        return list(tables)
+        
+    @staticmethod
+    def _arrow_batch(pa, schema, rows):
+        arrays = []
+        for field in schema:
+            values = [row[field.name] for row in rows]
+            if pa.types.is_boolean(field.type):
+                values = [None if value is None else bool(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+        
+    def import_from_csv(self, characters_file, maps_file, builds_file=None, on_progress=None, dry_run=False):
+        """Import data from CSV files written by export_to_csv
+        
+        All three files are checked first: every row must parse, ids must not
+        be taken already and references must resolve. Nothing is written
+        unless they pass, and with dry_run nothing is written at all. Rows
+        are then loaded with executemany in batches of CSV_IMPORT_BATCH, with
+        INDEXES and the rollup triggers rebuilt once at the end, all in one
+        transaction. on_progress(stats) is called after every batch of runs.
+        
+        Returns stats with characters, builds, runs, items, rows, seconds and
+        rows_per_second. Raises ValueError listing the problems found.
+        """
+        started = time.perf_counter()
+        stats = self._validate_csv_import(characters_file, maps_file, builds_file)
+        stats.update(items=0, rows=0, seconds=0.0, rows_per_second=0.0)
+        if dry_run:
+            return stats
+        
+        def report(rows):
+            stats['rows'] += rows
+            stats['seconds'] = time.perf_counter() - started
+            stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+            if on_progress:
+                on_progress(stats)
+                
+        cursor = self.conn.cursor()
+        with self.transaction():
+            # Built once after the load instead of row by row
+            self.drop_indexes()
+            self.drop_rollup_triggers()
+            
+            characters = [row for _, row in self._csv_rows(characters_file, self._parse_character_row)]
+            cursor.executemany('''
+                INSERT INTO characters (id, name, level, class, ascendancy)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [row[:5] for row in characters])
+            report(len(characters))
             if builds_file:
-                with open(builds_file, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        cursor.execute('''
-                            INSERT INTO builds (id, character_id, name, url, created_at, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (
-                            int(row['ID']),
-                            int(row['Character ID']),
-                            row['Name'],
-                            row['URL'],
-                            row['Created At'],
-                            row['Updated At']
-                        ))
+                for batch in self._batches(row for _, row in self._csv_rows(builds_file, self._parse_build_row)):
+                    cursor.executemany('''
+                        INSERT INTO builds (id, character_id, name, url, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', batch)
+                    report(len(batch))
+                # Builds exist now, so characters can point at them
+                cursor.executemany(
+                    'UPDATE characters SET current_build_id = ? WHERE id = ?',
+                    [(row[5], row[0]) for row in characters if row[5] is not None]
+                )
+                
+            # Summary columns are filled in from the parsed items as runs are inserted
+            columns = ('id', 'map_name', 'map_level', 'boss_count', 'start_time', 'duration', 'completion_status',
+                       'has_breach', 'has_delirium', 'has_expedition', 'has_ritual', 'breach_count',
+                       'character_id', 'build_id') + self.SUMMARY_COLUMNS
+            insert_run = f"INSERT INTO map_runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            for batch in self._batches(row for _, row in self._csv_rows(maps_file, self._parse_map_row)):
+                cursor.executemany(insert_run, [run + tuple(self._summarize(items)) for run, items in batch])
+                items = [
+                    (run[0], self._item_name_id(cursor, name), None, None, stack_size)
+                    for run, run_items in batch
+                    for name, stack_size in run_items.items()
+                ]
+                cursor.executemany(self.INSERT_ITEM_SQL, items)
+                stats['items'] += len(items)
+                report(len(batch) + len(items))
                 
-                # Now update characters with their current_build_id
-                with open(characters_file, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if row['Current Build ID']:
-                            cursor.execute('''
-                                UPDATE characters 
-                                SET current_build_id = ?
-                                WHERE id = ?
-                            ''', (
-                                int(row['Current Build ID']),
-                                int(row['ID'])
-                            ))
+            self.create_indexes()
+            self.create_rollups(rebuild=True)
+        self._clear_caches()
+        report(0)
+        return stats
+        
+    def _validate_csv_import(self, characters_file, maps_file, builds_file):
+        """Check CSV files before import, return counts of their rows or raise ValueError"""
+        cursor = self.conn.cursor()
+        errors = []
+        
+        def check_new(table, file_name, line, row_id, seen):
+            if row_id in seen:
+                errors.append(f"{file_name}, line {line}: {table} id {row_id} is repeated or already in the database")
+            seen.add(row_id)
             
-            # Then import map runs
-            with open(maps_file, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Parse duration from MM:SS format
-                    duration_parts = row['Duration'].split(':')
-                    duration = int(duration_parts[0]) * 60 + int(duration_parts[1])
-                    
-                    # Parse items from comma-separated string
-                    items = []
-                    if row['Items'] != 'None':
-                        for item_str in row['Items'].split(', '):
-                            if ' x' in item_str:
-                                name, count = item_str.rsplit(' x', 1)
-                                items.append({
-                                    'name': name,
-                                    'stack_size': int(count),
-                                    'rarity': None,
-                                    'item_class': None
-                                })
-                    
-                    cursor.execute('''
-                        INSERT INTO map_runs (
-                            id, map_name, map_level, boss_count, start_time, duration, 
-                            items, completion_status, has_breach, has_delirium,
-                            has_expedition, has_ritual, breach_count, character_id, build_id
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        int(row['ID']),
-                        row['Map Name'],
-                        int(row['Map Level']),
-                        int(row['Boss Count']),
-                        row['Start Time'],
-                        duration,
-                        json.dumps(items),
-                        'complete' if row['Status'] == 'Complete' else 'rip',
-                        row['Has Breach'] == 'Yes',
-                        row['Has Delirium'] == 'Yes',
-                        row['Has Expedition'] == 'Yes',
-                        row['Has Ritual'] == 'Yes',
-                        int(row['Breach Count']),
-                        int(row['Character ID']) if row['Character ID'] else None,
-                        int(row['Build ID']) if row['Build ID'] else None
-                    ))
+        def existing(table):
+            cursor.execute(f'SELECT id FROM {table}')
+            return {row[0] for row in cursor.fetchall()}
             
-            # Commit transaction if everything succeeded
-            self.conn.commit()
+        stats = {'characters': 0, 'builds': 0, 'runs': 0}
+        character_ids = existing('characters')
+        build_ids = existing('builds')
+        run_ids = existing('map_runs')
+        current_builds = []
+        try:
+            for line, row in self._csv_rows(characters_file, self._parse_character_row):
+                check_new('character', characters_file, line, row[0], character_ids)
+                if row[5] is not None:
+                    current_builds.append((line, row[5]))
+                stats['characters'] += 1
+            if builds_file:
+                for line, row in self._csv_rows(builds_file, self._parse_build_row):
+                    check_new('build', builds_file, line, row[0], build_ids)
+                    if row[1] not in character_ids:
+                        errors.append(f"{builds_file}, line {line}: unknown character {row[1]}")
+                    stats['builds'] += 1
+                for line, build_id in current_builds:
+                    if build_id not in build_ids:
+                        errors.append(f"{characters_file}, line {line}: unknown current build {build_id}")
+            for line, (run, _) in self._csv_rows(maps_file, self._parse_map_row):
+                check_new('map run', maps_file, line, run[0], run_ids)
+                if run[12] is not None and run[12] not in character_ids:
+                    errors.append(f"{maps_file}, line {line}: unknown character {run[12]}")
+                if run[13] is not None and run[13] not in build_ids:
+                    errors.append(f"{maps_file}, line {line}: unknown build {run[13]}")
+                stats['runs'] += 1
+                if len(errors) >= self.CSV_IMPORT_MAX_ERRORS:
+                    break
+        except ValueError as e:
+            errors.append(str(e))
+        if errors:
+            raise ValueError("\n".join(errors[:self.CSV_IMPORT_MAX_ERRORS]))
+        return stats
+        
+    @staticmethod
+    def _csv_rows(file_name, parse):
+        """(line number, parse(row)) for each row of a CSV file, raising ValueError naming the bad line"""
+        with open(file_name, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    yield reader.line_num, parse(row)
+                except (KeyError, ValueError, IndexError) as e:
+                    raise ValueError(f"{file_name}, line {reader.line_num}: {e!r}") from None
+                    
+    def _batches(self, rows):
+        """Lists of up to CSV_IMPORT_BATCH rows"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.CSV_IMPORT_BATCH:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
             
-        except Exception as e:
-            # Rollback transaction on error
-            self.conn.rollback()
-            raise e
+    @staticmethod
+    def _parse_character_row(row):
+        return (
+            int(row['ID']),
+            row['Name'],
+            int(row['Level']),
+            row['Class'],
+            row['Ascendancy'] or None,
+            int(row['Current Build ID']) if row['Current Build ID'] else None
+        )
+        
+    @staticmethod
+    def _parse_build_row(row):
+        return (
+            int(row['ID']),
+            int(row['Character ID']),
+            row['Name'],
+            row['URL'],
+            row['Created At'],
+            row['Updated At']
+        )
+        
+    @classmethod
+    def _parse_map_row(cls, row):
+        """map_runs values and {item name: stack size} of a maps CSV row"""
+        # Duration is MM:SS
+        minutes, seconds = row['Duration'].split(':')
+        items = {}
+        if row['Items'] != 'None':
+            # "Name xN, Name xN", names may themselves contain ", "
+            for name, count in cls.CSV_ITEM_PATTERN.findall(row['Items']):
+                items[name] = items.get(name, 0) + int(count)
+        run = (
+            int(row['ID']),
+            row['Map Name'],
+            int(row['Map Level']),
+            int(row['Boss Count']),
+            row['Start Time'],
+            int(minutes) * 60 + int(seconds),
+            'complete' if row['Status'] == 'Complete' else 'rip',
+            row['Has Breach'] == 'Yes',
+            row['Has Delirium'] == 'Yes',
+            row['Has Expedition'] == 'Yes',
+            row['Has Ritual'] == 'Yes',
+            int(row['Breach Count']),
+            int(row['Character ID']) if row['Character ID'] else None,
+            int(row['Build ID']) if row['Build ID'] else None
+        )
+        return run, items
         
     def add_character(self, name, character_class, level=1, ascendancy=None):
         """Add a new character to the database"""
@@ -384,7 +1062,7 @@ class Database:
             INSERT INTO characters (name, class, level, ascendancy)
             VALUES (?, ?, ?, ?)
         ''', (name, character_class, level, ascendancy))
-        self.conn.commit()
+        self._commit()
         return cursor.lastrowid
         
     def get_characters(self):
@@ -395,12 +1073,18 @@ class Database:
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
         
     def get_character(self, character_id):
-        """Get a specific character by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM characters WHERE id = ?', (character_id,))
-        columns = [description[0] for description in cursor.description]
-        row = cursor.fetchone()
-        return dict(zip(columns, row)) if row else None
+        """Get a specific character by ID, cached until the character changes"""
+        character = self._characters.get(character_id)
+        if character is None:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT * FROM characters WHERE id = ?', (character_id,))
+            columns = [description[0] for description in cursor.description]
+            row = cursor.fetchone()
+            if not row:
+                return None
+            character = self._characters[character_id] = dict(zip(columns, row))
+        # A copy, so callers changing it cannot change the cache
+        return dict(character)
         
     def update_character(self, character_id, name=None, level=None, ascendancy=None):
         """Update a character's details"""
@@ -422,19 +1106,12 @@ class Database:
             query = f"UPDATE characters SET {', '.join(updates)} WHERE id = ?"
             params.append(character_id)
             cursor.execute(query, params)
-            self.conn.commit()
+            self._commit()
+            self._characters.pop(character_id, None)
         
     def get_character_runs(self, character_id):
         """Get all map runs for a specific character"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM map_runs WHERE character_id = ? ORDER BY start_time DESC', (character_id,))
-        columns = [description[0] for description in cursor.description]
-        runs = []
-        for row in cursor.fetchall():
-            run = dict(zip(columns, row))
-            run['items'] = json.loads(run['items']) if run['items'] else []
-            runs.append(run)
-        return runs
+        return self.query_runs({'character_id': character_id})
         
     def add_build(self, character_id, name, url):
         """Add a new build for a character"""
@@ -443,7 +1120,7 @@ class Database:
             INSERT INTO builds (character_id, name, url)
             VALUES (?, ?, ?)
         ''', (character_id, name, url))
-        self.conn.commit()
+        self._commit()
         return cursor.lastrowid
         
     def get_builds(self, character_id):
@@ -461,12 +1138,17 @@ class Database:
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
         
     def get_build(self, build_id):
-        """Get a specific build by ID"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM builds WHERE id = ?', (build_id,))
-        columns = [description[0] for description in cursor.description]
-        row = cursor.fetchone()
-        return dict(zip(columns, row)) if row else None
+        """Get a specific build by ID, cached until the build changes"""
+        build = self._builds.get(build_id)
+        if build is None:
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT * FROM builds WHERE id = ?', (build_id,))
+            columns = [description[0] for description in cursor.description]
+            row = cursor.fetchone()
+            if not row:
+                return None
+            build = self._builds[build_id] = dict(zip(columns, row))
+        return dict(build)
         
     def update_build(self, build_id, name=None, url=None):
         """Update a build's details"""
@@ -486,7 +1168,8 @@ class Database:
             query = f"UPDATE builds SET {', '.join(updates)} WHERE id = ?"
             params.append(build_id)
             cursor.execute(query, params)
-            self.conn.commit()
+            self._commit()
+            self._builds.pop(build_id, None)
         
     def delete_build(self, build_id):
         """Delete a build"""
@@ -499,7 +1182,9 @@ class Database:
         ''', (build_id,))
         # Then delete the build
         cursor.execute('DELETE FROM builds WHERE id = ?', (build_id,))
-        self.conn.commit()
+        self._commit()
+        # Any character may have lost its current build
+        self._clear_caches()
         
     def set_current_build(self, character_id, build_id):
         """Set the current build for a character"""
@@ -509,7 +1194,8 @@ class Database:
             SET current_build_id = ?
             WHERE id = ?
         ''', (build_id, character_id))
-        self.conn.commit()
+        self._commit()
+        self._characters.pop(character_id, None)
         
     def get_current_build(self, character_id):
         """Get the current build for a character"""
@@ -0,0 +1,123 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from .database import Database
+
+
+class DatabaseWriter:
+    """Background thread that owns a write connection and runs Database writes in order
+
+    submit() queues a call to a Database method and returns a Future for its
+    result, e.g. the id of a new map run. Commands run one after another in
+    the order they were submitted. Whatever is queued when the thread picks
+    up work is written in a single transaction. stop() writes everything
+    still queued before it returns, so nothing is lost on exit.
+    
+    Arguments can be Futures returned by earlier submit() calls, they are
+    replaced by their results on the writer thread. A command whose Future
+    argument failed fails with the same error.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # Items are (future, method name or None for flush, args, kwargs), None stops the thread
+        self.queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()  # Keeps submit() and stop() from interleaving
+
+    def start(self):
+        if self._thread is not None:
+            return
+        # Open the connection before returning so schema errors surface here
+        ready = Future()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name='DatabaseWriter', daemon=True)
+        self._thread.start()
+        try:
+            ready.result()
+        except Exception:
+            self._thread = None
+            raise
+
+    def stop(self):
+        """Write everything already submitted, then stop the thread"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self.queue.put(None)
+            thread, self._thread = self._thread, None
+        thread.join()
+
+    def is_running(self):
+        return self._thread is not None
+
+    def submit(self, method, *args, **kwargs):
+        """Queue a call to Database.<method>(*args, **kwargs), return a Future for its result"""
+        if not callable(getattr(Database, method, None)):
+            raise AttributeError(f"Database has no method {method}")
+        return self._put(method, args, kwargs)
+
+    def flush(self, timeout=None):
+        """Block until everything submitted so far is committed"""
+        self._put(None, (), {}).result(timeout)
+
+    def _put(self, method, args, kwargs):
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                raise RuntimeError("DatabaseWriter is not running")
+            self.queue.put((future, method, args, kwargs))
+        return future
+
+    def _run(self, ready):
+        try:
+            db = Database(self.db_path)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+        try:
+            while True:
+                commands = [self.queue.get()]
+                # Take the rest of the burst too, it all goes in one commit
+                while True:
+                    try:
+                        commands.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = None in commands
+                self._write(db, [command for command in commands if command is not None])
+                if stopping:
+                    break
+        finally:
+            db.conn.close()
+
+    def _write(self, db, commands):
+        results = {}  # Future -> result, for commands in this batch
+        try:
+            with db.transaction():
+                for future, method, args, kwargs in commands:
+                    args = [self._resolve(arg, results) for arg in args]
+                    results[future] = getattr(db, method)(*args, **kwargs) if method else None
+        except Exception as e:
+            # The whole batch was rolled back, so redo each command on its
+            # own and fail only the one that raised
+            if len(commands) > 1:
+                for command in commands:
+                    self._write(db, [command])
+                return
+            future, method, _, _ = commands[0]
+            print(f"Error writing to database ({method}): {e}")
+            future.set_exception(e)
+            return
+        for future, result in results.items():
+            future.set_result(result)
+            
+    @staticmethod
+    def _resolve(arg, results):
+        """Result of a Future argument, from this batch or an earlier one"""
+        if not isinstance(arg, Future):
+            return arg
+        if arg in results:
+            return results[arg]
+        # Earlier batches have finished, so this never waits
+        return arg.result()
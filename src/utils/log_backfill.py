@@ -0,0 +1,90 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+if __name__ == '__main__':
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.log_parser import LogParser
+from src.utils.log_scanner import scan_log_parallel
+from src.utils.map_session import MapSession
+
+
+def reconstruct_runs(events, character=None):
+    """Rebuild finished map runs from a stream of log events.
+
+    Uses the same MapSession rules as the live tracker. Since nobody is there
+    to press "End Map", a paused map also ends when a different instance is
+    entered. A run with a logged death of character (any character when it
+    is None) is stored as a RIP. A map still open at the end of the log is
+    left out.
+    """
+    session = MapSession(character)
+    for event in events:
+        if event['type'] == 'map_start':
+            if session.active and event.get('seed') != session.seed:
+                if not session.paused:
+                    session.leave(event)
+                yield session.to_run()
+                session.reset()
+            session.enter(event)
+        elif event['type'] == 'map_end' and session.active:
+            if not session.leave(event):
+                yield session.to_run()
+                session.reset()
+        elif event['type'] == 'player_death':
+            session.record_death(event)
+
+
+def backfill_map_runs(db, log_path, character_id=None, progress=None, workers=1):
+    """Import the map runs already recorded in a Client.txt into map_runs.
+
+    Streams the log once and inserts every reconstructed run in a single
+    transaction. With workers > 1 the log is scanned in parallel processes
+    first. progress, if given, is called with the running stats dict.
+    Returns stats with bytes, lines, runs, seconds and lines_per_second.
+    """
+    parser = LogParser(log_path)
+    character = db.get_character(character_id) if character_id else None
+    stats = {'bytes': 0, 'lines': 0, 'runs': 0, 'inserted': 0}
+    started = time.perf_counter()
+
+    if workers > 1:
+        events = scan_log_parallel(log_path, workers, stats)
+    else:
+        events = parser.scan_history(stats)
+
+    def runs():
+        for run in reconstruct_runs(events, character['name'] if character else None):
+            stats['runs'] += 1
+            if progress:
+                progress(stats)
+            yield run
+
+    stats['inserted'] = db.add_map_runs(runs(), character_id)
+    stats['seconds'] = time.perf_counter() - started
+    stats['lines_per_second'] = stats['lines'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Import past map runs from a Path of Exile 2 Client.txt")
+    arg_parser.add_argument('log_path', help="Path to Client.txt")
+    arg_parser.add_argument('--db', default='poe2_maps.db', help="Database file (default: poe2_maps.db)")
+    arg_parser.add_argument('--character-id', type=int, default=None,
+                            help="Character to assign the imported runs to")
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help="Processes to scan the log with (default: 1)")
+    args = arg_parser.parse_args(argv)
+
+    from src.utils.database import Database
+    db = Database(args.db)
+    stats = backfill_map_runs(db, args.log_path, args.character_id, workers=args.workers)
+    print(f"Scanned {stats['lines']:,} lines ({stats['bytes'] / 1024 / 1024:.1f} MB) "
+          f"in {stats['seconds']:.2f}s ({stats['lines_per_second']:,.0f} lines/s)")
+    print(f"Reconstructed {stats['runs']} map runs, imported {stats['inserted']} new")
+
+
+if __name__ == '__main__':
+    main()
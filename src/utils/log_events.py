@@ -0,0 +1,147 @@
+import sys
+
+
+class LogEvent:
+    """Base class for events parsed from Client.txt
+
+    Events are small __slots__ objects instead of dicts. They still answer
+    event['field'] and event.get('field'), including event['type'], so code
+    written against the old dict events keeps working.
+    """
+    __slots__ = ('timestamp',)
+    type = None
+    FIELDS = ('timestamp',)  # Field names in constructor order
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = cls.__base__.FIELDS + cls.__slots__
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return key == 'type' or key in self.FIELDS
+
+    def keys(self):
+        return ('type',) + self.FIELDS
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+
+class MapStart(LogEvent):
+    __slots__ = ('map_name', 'map_level', 'has_boss', 'seed')
+    type = 'map_start'
+
+    def __init__(self, timestamp, map_name, map_level, has_boss, seed):
+        self.timestamp = timestamp
+        self.map_name = sys.intern(map_name)
+        self.map_level = map_level
+        self.has_boss = has_boss
+        self.seed = seed
+
+
+class MapEnd(LogEvent):
+    __slots__ = ('next_area', 'area_kind')
+    type = 'map_end'
+
+    def __init__(self, timestamp, next_area, area_kind):
+        self.timestamp = timestamp
+        self.next_area = sys.intern(next_area)
+        self.area_kind = area_kind
+
+
+class InstanceConnect(LogEvent):
+    __slots__ = ('address',)
+    type = 'instance_connect'
+
+    def __init__(self, timestamp, address):
+        self.timestamp = timestamp
+        self.address = address
+
+
+class PlayerDeath(LogEvent):
+    __slots__ = ('character',)
+    type = 'player_death'
+
+    def __init__(self, timestamp, character):
+        self.timestamp = timestamp
+        self.character = sys.intern(character)
+
+
+class LevelUp(LogEvent):
+    __slots__ = ('character', 'character_class', 'level')
+    type = 'level_up'
+
+    def __init__(self, timestamp, character, character_class, level):
+        self.timestamp = timestamp
+        self.character = sys.intern(character)
+        self.character_class = sys.intern(character_class)
+        self.level = level
+
+
+EVENT_TYPES = (MapStart, MapEnd, InstanceConnect, PlayerDeath, LevelUp)
+
+
+class EventBatch:
+    """Column-wise storage for a long run of events, in their original order
+
+    Keeps one list per field of each event type plus the type order, instead
+    of one object per event. Much cheaper to hold and to pickle across
+    processes when scanning millions of lines.
+    """
+    __slots__ = ('kinds', 'columns')
+
+    def __init__(self):
+        self.kinds = []  # Index into EVENT_TYPES for every event, in order
+        self.columns = [tuple([] for _ in event_type.FIELDS) for event_type in EVENT_TYPES]
+
+    @classmethod
+    def from_events(cls, events):
+        batch = cls()
+        batch.extend(events)
+        return batch
+
+    def append(self, event):
+        kind = EVENT_TYPES.index(type(event))
+        self.kinds.append(kind)
+        for column, name in zip(self.columns[kind], event.FIELDS):
+            column.append(getattr(event, name))
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    def column(self, event_type, name):
+        """All values of one field of one event type, e.g. column(MapStart, 'map_name')"""
+        kind = EVENT_TYPES.index(event_type)
+        return self.columns[kind][event_type.FIELDS.index(name)]
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __iter__(self):
+        """Rebuild the events in their original order"""
+        positions = [0] * len(EVENT_TYPES)
+        for kind in self.kinds:
+            position = positions[kind]
+            positions[kind] = position + 1
+            yield EVENT_TYPES[kind](*(column[position] for column in self.columns[kind]))
@@ -0,0 +1,245 @@
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+if __name__ == '__main__':
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+
+# Every Client.txt line starts with "YYYY/MM/DD HH:MM:SS"
+TIMESTAMP_LENGTH = 19
+
+
+def timestamp_key(raw):
+    """Seconds key for a "YYYY/MM/DD HH:MM:SS" bytes/str prefix, or None if it is not one"""
+    if len(raw) < TIMESTAMP_LENGTH:
+        return None
+    if isinstance(raw, str):
+        raw = raw.encode('ascii', errors='replace')
+    try:
+        if raw[4:5] != b'/' or raw[7:8] != b'/' or raw[10:11] != b' ':
+            return None
+        ordinal = datetime(int(raw[0:4]), int(raw[5:7]), int(raw[8:10])).toordinal()
+        return ordinal * 86400 + int(raw[11:13]) * 3600 + int(raw[14:16]) * 60 + int(raw[17:19])
+    except ValueError:
+        return None
+
+
+def datetime_key(value):
+    """Seconds key of a datetime, comparable with timestamp_key"""
+    return value.toordinal() * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+
+
+class LogIndex:
+    """Sparse on-disk index from timestamps to byte offsets in Client.txt
+
+    Roughly every `stride` bytes the start of a line is recorded with its
+    timestamp, so a time range can be read by mapping just the slice between
+    two entries instead of the whole log. The index lives in a sidecar file
+    and is extended as the log grows. The sidecar is only written when an
+    entry is added and on close(), not on every append. It is rebuilt from
+    scratch when the log is truncated or replaced.
+    """
+    MAGIC = b'AAIX'
+    VERSION = 1
+    PREFIX_SIZE = 64  # Leading log bytes kept to notice a replaced log
+    # magic, version, prefix length, stride, indexed size, next sample offset, prefix
+    HEADER = struct.Struct('<4sHHIQQ64s')
+    ENTRY = struct.Struct('<qQ')  # timestamp key, line offset
+
+    def __init__(self, log_path, index_path=None, stride=64 * 1024):
+        self.log_path = Path(log_path)
+        self.index_path = Path(index_path) if index_path else self.log_path.with_name(self.log_path.name + '.idx')
+        self.stride = stride
+        self._lock = threading.Lock()
+        self._clear()
+        self._load()
+
+    def _clear(self):
+        self.keys = []  # Timestamp keys, never decreasing
+        self.offsets = []
+        self.indexed_size = 0
+        self.next_sample = 0
+        self.prefix = b''
+        self._saved_entries = 0
+        self._saved_size = 0  # indexed_size as last written to the sidecar
+
+    def _load(self):
+        """Read the sidecar, keeping nothing if it is missing or unreadable"""
+        try:
+            data = self.index_path.read_bytes()
+        except OSError:
+            return
+        if len(data) < self.HEADER.size:
+            return
+        magic, version, prefix_len, stride, indexed_size, next_sample, prefix = self.HEADER.unpack_from(data)
+        if magic != self.MAGIC or version != self.VERSION or stride != self.stride:
+            return
+        body = data[self.HEADER.size:]
+        count = len(body) // self.ENTRY.size
+        for key, offset in self.ENTRY.iter_unpack(body[:count * self.ENTRY.size]):
+            self.keys.append(key)
+            self.offsets.append(offset)
+        self.indexed_size = indexed_size
+        self.next_sample = next_sample
+        self.prefix = prefix[:prefix_len]
+        self._saved_entries = count
+        self._saved_size = indexed_size
+
+    def _save(self):
+        """Append new entries to the sidecar and rewrite its header"""
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, len(self.prefix), self.stride,
+                                  self.indexed_size, self.next_sample, self.prefix)
+        new_entries = b''.join(
+            self.ENTRY.pack(key, offset)
+            for key, offset in zip(self.keys[self._saved_entries:], self.offsets[self._saved_entries:])
+        )
+        if self._saved_entries == 0 or not self.index_path.exists():
+            with open(self.index_path, 'wb') as f:
+                f.write(header)
+                f.write(new_entries)
+        else:
+            with open(self.index_path, 'r+b') as f:
+                f.write(header)
+                f.seek(self.HEADER.size + self._saved_entries * self.ENTRY.size)
+                f.write(new_entries)
+                f.truncate()
+        self._saved_entries = len(self.keys)
+        self._saved_size = self.indexed_size
+
+    def reset(self):
+        """Forget everything indexed, used when the log was truncated or replaced"""
+        with self._lock:
+            self._clear()
+            try:
+                self.index_path.unlink()
+            except OSError:
+                pass
+
+    def update(self):
+        """Index whatever was appended to the log since the last update"""
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return
+        with open(self.log_path, 'rb') as f:
+            prefix = f.read(self.PREFIX_SIZE)
+        if size < self.indexed_size or prefix[:len(self.prefix)] != self.prefix:
+            self.reset()
+        if size == self.indexed_size or size == 0:
+            return
+
+        with self._lock:
+            self.prefix = prefix
+            with open(self.log_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self._sample(mm, size)
+            self.indexed_size = size
+            # Tailing appends a few lines at a time, entries only come every stride bytes
+            if len(self.keys) > self._saved_entries:
+                self._save()
+
+    def close(self):
+        """Write the indexed size to the sidecar if it changed since the last entry"""
+        with self._lock:
+            if self.indexed_size == self._saved_size:
+                return
+            try:
+                self._save()
+            except OSError as e:
+                # The index is only a cache, the next update samples the rest again
+                print(f"Error saving log index: {e}")
+
+    def _sample(self, mm, size):
+        # Only the pages around each sample point are touched
+        while self.next_sample < size:
+            if self.next_sample == 0:
+                start = 0
+            else:
+                newline = mm.find(b'\n', self.next_sample - 1, size)
+                if newline == -1:
+                    break
+                start = newline + 1
+            # Wait for the line to be complete before trusting its timestamp
+            if mm.find(b'\n', start, size) == -1:
+                break
+            key = timestamp_key(mm[start:start + TIMESTAMP_LENGTH])
+            if key is None:
+                self.next_sample = start + 1
+                continue
+            # Out of order timestamps are skipped so the keys stay searchable
+            if not self.keys or key >= self.keys[-1]:
+                self.keys.append(key)
+                self.offsets.append(start)
+            self.next_sample = start + self.stride
+
+    def byte_range(self, start, end):
+        """Byte range of the log that holds every line timestamped start..end (datetimes)"""
+        start_key, end_key = datetime_key(start), datetime_key(end)
+        with self._lock:
+            # Last sample before start, first sample after end
+            lo = bisect.bisect_left(self.keys, start_key) - 1
+            hi = bisect.bisect_right(self.keys, end_key)
+            begin = self.offsets[lo] if lo >= 0 else 0
+            stop = self.offsets[hi] if hi < len(self.offsets) else None
+        return begin, stop
+
+    def iter_lines(self, start, end):
+        """Yield (offset, raw line bytes) for log lines timestamped start..end inclusive"""
+        self.update()
+        begin, stop = self.byte_range(start, end)
+        start_key, end_key = datetime_key(start), datetime_key(end)
+        with open(self.log_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if stop is None:
+                    stop = len(mm)
+                pos = begin
+                in_range = False
+                while pos < stop:
+                    newline = mm.find(b'\n', pos, stop)
+                    line_end = stop if newline == -1 else newline
+                    key = timestamp_key(mm[pos:pos + TIMESTAMP_LENGTH])
+                    if key is not None:
+                        if key > end_key:
+                            break
+                        in_range = key >= start_key
+                    # Lines without a timestamp belong with the line before them
+                    if in_range:
+                        yield pos, mm[pos:line_end].rstrip(b'\r')
+                    pos = line_end + 1
+
+    def lines_between(self, start, end):
+        """Decoded log lines timestamped start..end inclusive"""
+        return [raw.decode('utf-8', errors='replace') for _, raw in self.iter_lines(start, end)]
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Print the Client.txt lines between two timestamps")
+    arg_parser.add_argument('log_path', help="Path to Client.txt")
+    arg_parser.add_argument('start', help='Start time, "YYYY/MM/DD HH:MM:SS"')
+    arg_parser.add_argument('end', help='End time, "YYYY/MM/DD HH:MM:SS"')
+    arg_parser.add_argument('--index', default=None, help="Index file (default: next to the log)")
+    arg_parser.add_argument('--events', action='store_true', help="Print parsed map events instead of lines")
+    args = arg_parser.parse_args(argv)
+
+    start = datetime.strptime(args.start, '%Y/%m/%d %H:%M:%S')
+    end = datetime.strptime(args.end, '%Y/%m/%d %H:%M:%S')
+    if args.events:
+        from src.utils.log_parser import LogParser
+        parser = LogParser(args.log_path, index_path=args.index)
+        for event in parser.events_between(start, end):
+            print(event)
+    else:
+        index = LogIndex(args.log_path, args.index)
+        for line in index.lines_between(start, end):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
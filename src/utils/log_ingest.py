@@ -0,0 +1,252 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+
+class PollBackend:
+    """Fallback backend that compares the log's size and mtime on an interval"""
+    name = 'poll'
+
+    def __init__(self, path, interval=0.25):
+        self.path = path
+        self.interval = interval
+        self._last = self._snapshot()
+
+    def _snapshot(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def wait(self, timeout):
+        """Block up to timeout seconds, return True if the log changed"""
+        time.sleep(min(self.interval, timeout))
+        current = self._snapshot()
+        if current != self._last:
+            self._last = current
+            return True
+        return False
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """Linux backend that blocks on inotify events for the log's directory"""
+    name = 'inotify'
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._target = os.fsencode(os.path.basename(self.path))
+        libc = self._load_libc()
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory so a replaced or recreated log is still seen
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        directory = os.fsencode(os.path.dirname(self.path))
+        if libc.inotify_add_watch(self._fd, directory, mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch failed")
+
+    @staticmethod
+    def _load_libc():
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+
+    @classmethod
+    def available(cls):
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            cls._load_libc()
+        except (OSError, AttributeError):
+            return False
+        return True
+
+    def wait(self, timeout):
+        """Block up to timeout seconds, return True if the log changed"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        changed = False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            _, _, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name == self._target:
+                changed = True
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class LogIngestWorker:
+    """Background thread that owns the LogParser and queues its events for the UI
+
+    The queue is bounded. When it is full the worker stops reading until the
+    consumer drains it, so a large backlog is paced by the UI instead of
+    piling up in memory. Events still queued when the worker stops are put
+    back in the log: the parser is rewound to the first of them, so the
+    next worker on the same parser reads them again. A failed read, e.g.
+    while the log is being rotated, is logged and retried on the next wake
+    instead of ending the thread.
+    """
+    WAIT_TIMEOUT = 0.5  # How often the thread checks for stop requests
+    PUT_TIMEOUT = 0.1
+
+    def __init__(self, log_parser, backend, max_queue=1000, debounce=0.05, on_events=None):
+        self.log_parser = log_parser
+        self.backend = backend
+        self.debounce = debounce
+        self.on_events = on_events
+        # Items are (event, time the log was written or None, log offset of the event's line)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        # Backpressure metrics, each written by a single thread
+        self.produced = 0
+        self.consumed = 0
+        self.requeued = 0  # Events left in the log for the next start
+        self.high_water = 0
+        self.full_waits = 0
+        self.blocked_seconds = 0.0
+        self.errors = 0  # Reads that failed and were retried
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='LogIngestWorker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        # Events nobody drained are read again from the log next time
+        undrained = []
+        while True:
+            try:
+                undrained.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if undrained:
+            self.log_parser.rewind(undrained[0][2])
+            self.requeued += len(undrained)
+
+    def is_running(self):
+        return self._thread is not None
+
+    def _run(self):
+        # Pick up anything written between parser creation and now
+        retry = not self._ingest(None)
+        while not self._stop_event.is_set():
+            # After a failed read, try again once the wait times out even if nothing changed
+            if not self.backend.wait(self.WAIT_TIMEOUT) and not retry:
+                continue
+            try:
+                written_at = os.stat(self.log_parser.log_path).st_mtime
+            except OSError:
+                continue
+            # Let a burst of writes settle so it is read in one pass
+            if self._stop_event.wait(self.debounce):
+                break
+            retry = not self._ingest(written_at)
+
+    def _ingest(self, written_at):
+        """Queue the events of new log lines, return False if reading the log failed"""
+        queued = False
+        ok = True
+        try:
+            for event in self.log_parser.iter_updates():
+                # While an event is handed out, the parser's position is the start of its line.
+                # If the worker is stopped here the parser keeps that position, so the line is read again.
+                if not self._put((event, written_at, self.log_parser.last_position)):
+                    break
+                queued = True
+        except Exception as e:
+            self.errors += 1
+            print(f"Error reading log file: {e}")
+            ok = False
+        if queued and self.on_events:
+            self.on_events()
+        return ok
+
+    def _put(self, item):
+        """Queue an item, blocking while the queue is full. False if stopped first."""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.full_waits += 1
+            started = time.monotonic()
+            # Make sure the consumer knows there is something to drain
+            if self.on_events:
+                self.on_events()
+            while True:
+                if self._stop_event.is_set():
+                    self.blocked_seconds += time.monotonic() - started
+                    return False
+                try:
+                    self.queue.put(item, timeout=self.PUT_TIMEOUT)
+                    break
+                except queue.Full:
+                    continue
+            self.blocked_seconds += time.monotonic() - started
+        self.produced += 1
+        self.high_water = max(self.high_water, self.queue.qsize())
+        return True
+
+    def drain(self, max_items=None):
+        """Take up to max_items queued (event, written_at) pairs without blocking"""
+        items = []
+        while max_items is None or len(items) < max_items:
+            try:
+                items.append(self.queue.get_nowait()[:2])
+            except queue.Empty:
+                break
+        self.consumed += len(items)
+        return items
+
+    def metrics(self):
+        return {
+            'depth': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'produced': self.produced,
+            'consumed': self.consumed,
+            'requeued': self.requeued,
+            'high_water': self.high_water,
+            'full_waits': self.full_waits,
+            'blocked_seconds': self.blocked_seconds,
+            'errors': self.errors
+        }
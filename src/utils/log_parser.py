@@ -1,8 +1,45 @@
 import re
 from datetime import datetime
 from pathlib import Path
+import sys
 import time
 
+from .log_events import MapStart, MapEnd, InstanceConnect, PlayerDeath, LevelUp
+
+# Every Client.txt line starts with this timestamp
+TIMESTAMP_PATTERN = r'(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2})'
+
+# "YYYY/MM/DD" -> (year, month, day), a log only spans a few hundred days
+_log_days = {}
+
+def parse_log_timestamp(text):
+    """datetime for a "YYYY/MM/DD HH:MM:SS" log timestamp, same result as strptime
+    
+    The layout is fixed, so the time is sliced out directly and only the date
+    part goes through strptime, once per day. Raises ValueError like strptime.
+    """
+    day = _log_days.get(text[:10])
+    if day is None:
+        date = datetime.strptime(text[:10], '%Y/%m/%d')
+        day = _log_days[text[:10]] = (date.year, date.month, date.day)
+    if len(text) != 19 or text[10] != ' ' or text[13] != ':' or text[16] != ':':
+        raise ValueError(f"time data {text!r} does not match format '%Y/%m/%d %H:%M:%S'")
+    return datetime(day[0], day[1], day[2], int(text[11:13]), int(text[14:16]), int(text[17:19]))
+
+class LogMatcher:
+    """One kind of log line: a literal marker that finds it cheaply and a regex that parses it"""
+    
+    def __init__(self, name, marker, pattern, build):
+        self.name = name
+        self.text = marker
+        self.marker = marker.encode('utf-8')
+        self.pattern = re.compile(pattern)
+        self.build = build  # build(parser, match) -> event or None
+        
+    def parse(self, parser, line):
+        match = self.pattern.search(line)
+        return self.build(parser, match) if match else None
+
 class LogParser:
     # Maps that never have bosses, even without _NoBoss suffix
     NO_BOSS_MAPS = {
@@ -13,122 +50,292 @@ class LogParser:
         'MapAlpineRidge'
     }
     
-    def __init__(self, custom_path=None):
+    READ_CHUNK_SIZE = 1024 * 1024
+    
+    # Areas classified by id prefix, checked in order, first matching prefix wins:
+    # (prefix, kind, map name format, has_boss)
+    # In the name format {raw} is the area id after the prefix, {spaced} the same
+    # with spaces before capitals and {base} the spaced part before any "_" suffix.
+    # has_boss None means it is read from the area id (see classify_area).
+    # A name format of None marks an area that is not a map. Every area that
+    # is not a map ends the current map.
+    AREA_RULES = (
+        ('ExpeditionLogBook_', 'expedition', 'Expedition: {raw}', False),
+        ('MapUberBoss_', 'uber_boss', '{spaced}', True),
+        ('Breach', 'breach', 'Twisted Domain', True),
+        ('Delirium', 'delirium', 'Simulacrum', True),
+        ('Map', 'map', '{base}', None),
+        ('Hideout', 'hideout', None, False),
+    )
+    _CAMEL_SPLIT = re.compile(r'(?<!^)(?=[A-Z])')
+    
+    def __init__(self, custom_path=None, index_path=None):
         if custom_path:
             self.log_path = Path(custom_path)
         else:
             self.log_path = Path.home() / "Documents" / "My Games" / "Path of Exile 2" / "logs" / "Client.txt"
         self.last_position = self.log_path.stat().st_size if self.log_path.exists() else 0
+        self._file = None
+        self._file_id = None
+        # Bytes of a line the game has not finished writing yet
+        self._partial = b''
+        # area id -> (map_name, has_boss, kind), only a few hundred distinct ids exist
+        self._area_cache = {}
+        self.matchers = list(self.MATCHERS)
+        # Optional timestamp -> offset index kept up to date while tailing
+        self.index = self._create_index(index_path) if index_path else None
+        
+    def _create_index(self, index_path=None):
+        # Imported here so log_index can also run as a script (python -m)
+        from .log_index import LogIndex
+        return LogIndex(self.log_path, index_path)
+        
+    def add_matcher(self, matcher):
+        """Emit events for another kind of log line, checked after the built-in ones"""
+        self.matchers.append(matcher)
+        
+    def close(self):
+        """Close the tailed log file handle and save the index"""
+        if self.index:
+            self.index.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_id = None
+        self._partial = b''
+        
+    def _open_log(self, stat):
+        """Open the log in binary mode, reopening it if the file was replaced"""
+        file_id = (stat.st_dev, stat.st_ino)
+        if self._file is not None and self._file_id != file_id:
+            # A new file took the old one's place, read it from the start
+            self.close()
+            self.last_position = 0
+            if self.index:
+                self.index.reset()
+        if self._file is None:
+            self._file = open(self.log_path, 'rb')
+            self._file_id = file_id
+        return self._file
+        
+    def _read_marker_lines(self):
+        """Yield (matcher, raw line) for complete appended lines containing a marker
+        
+        While a line is yielded last_position is the start of that line, so a
+        consumer that stops there reads it again on the next call.
+        """
+        f = self._file
+        f.seek(self.last_position)
+        while True:
+            chunk = f.read(self.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            base = self.last_position - len(self._partial)  # Offset of data in the file
+            data = self._partial + chunk if self._partial else chunk
+            
+            # Anything after the last newline is carried over to the next read
+            end = data.rfind(b'\n')
+            if end == -1:
+                self.last_position += len(chunk)
+                self._partial = data
+                continue
+            for matcher, start, stop in self._marker_line_spans(data, end):
+                self.last_position = base + start
+                self._partial = b''
+                yield matcher, data[start:stop]
+            self.last_position = base + len(data)
+            self._partial = data[end + 1:]
+            
+    def rewind(self, position):
+        """Read from position again on the next update, it must be the start of a line"""
+        self.last_position = position
+        self._partial = b''
+        
+    def iter_marker_lines(self, data, end, begin=0):
+        """Yield (matcher, line) for lines of data[begin:end] containing a matcher's marker
+        
+        data can be bytes or an mmap; begin must be the start of a line. Each
+        marker is found with a plain byte search over the buffer already in
+        memory, and lines without a marker are never split or decoded. When a
+        line holds several markers the first registered matcher gets it.
+        """
+        for matcher, start, stop in self._marker_line_spans(data, end, begin):
+            yield matcher, data[start:stop]
+            
+    def _marker_line_spans(self, data, end, begin=0):
+        """Yield (matcher, start, stop) for the lines iter_marker_lines finds"""
+        hits = {}
+        for matcher in self.matchers:
+            marker = matcher.marker
+            pos = data.find(marker, begin, end)
+            while pos != -1:
+                start = data.rfind(b'\n', begin, pos)
+                start = begin if start == -1 else start + 1
+                hits.setdefault(start, matcher)
+                stop = data.find(b'\n', pos, end)
+                if stop == -1:
+                    break
+                pos = data.find(marker, stop, end)
+        for start in sorted(hits):
+            stop = data.find(b'\n', start, end)
+            if stop == -1:
+                stop = end
+            yield hits[start], start, stop
+            
+    def parse_raw_line(self, matcher, raw_line):
+        """Decode a line found by iter_marker_lines and parse it with its matcher"""
+        return matcher.parse(self, raw_line.decode('utf-8', errors='replace'))
         
     def check_updates(self):
+        return list(self.iter_updates())
+        
+    def iter_updates(self):
+        """Yield events for appended lines as they are read, one chunk at a time"""
         if not self.log_path.exists():
-            return []
+            return
             
-        current_size = self.log_path.stat().st_size
+        stat = self.log_path.stat()
+        current_size = stat.st_size
         # Reset position if file is empty or rotated
         if current_size == 0 or current_size < self.last_position:
+            self.close()
             self.last_position = 0
-            
+            if self.index:
+                self.index.reset()
+                
         if current_size == self.last_position:
-            return []
+            return
             
-        events = []
-        with open(self.log_path, 'r', encoding='utf-8') as f:
-            f.seek(self.last_position)
-            for line in f:
-                if "Generating level" in line:
-                    print(f"Processing line: {line.strip()}")  # Debug print
-                    match = re.search(r'(\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}).*level (\d+) area "([^"]+)" with seed (\d+)', line)
-                    if match:
-                        print(f"Match groups: {match.groups()}")  # Debug print
-                    else:
-                        print("No match found")  # Debug print
-                    if match:
-                        timestamp = datetime.strptime(match.group(1), '%Y/%m/%d %H:%M:%S')
-                        area_level = int(match.group(2))
-                        area_name = match.group(3)
-                        seed = int(match.group(4))
-                        
-                        # Handle special map names first
-                        if area_name.startswith('ExpeditionLogBook_'):
-                            # Extract the second part after ExpeditionLogBook_ and prefix with "Expedition: "
-                            raw_name = area_name[len('ExpeditionLogBook_'):]
-                            map_name = f"Expedition: {raw_name}"
-                            events.append({
-                                'type': 'map_start',
-                                'timestamp': timestamp,
-                                'map_name': map_name,
-                                'map_level': area_level,
-                                'has_boss': False,
-                                'seed': seed
-                            })
-                        elif area_name.startswith('MapUberBoss_'):
-                            # Extract the second part after MapUberBoss_ and format it
-                            raw_name = area_name[len('MapUberBoss_'):]
-                            map_name = re.sub(r'(?<!^)(?=[A-Z])', ' ', raw_name)
-                            events.append({
-                                'type': 'map_start',
-                                'timestamp': timestamp,
-                                'map_name': map_name,
-                                'map_level': area_level,
-                                'has_boss': True,
-                                'seed': seed
-                            })
-                        elif area_name.startswith('Breach'):
-                            # Breach domains should be renamed to "Twisted Domain"
-                            map_name = "Twisted Domain"
-                            events.append({
-                                'type': 'map_start',
-                                'timestamp': timestamp,
-                                'map_name': map_name,
-                                'map_level': area_level,
-                                'has_boss': True,
-                                'seed': seed
-                            })
-                        elif area_name.startswith('Delirium'):
-                            # Delirium areas should be renamed to "Simulacrum"
-                            map_name = "Simulacrum"
-                            events.append({
-                                'type': 'map_start',
-                                'timestamp': timestamp,
-                                'map_name': map_name,
-                                'map_level': area_level,
-                                'has_boss': True,
-                                'seed': seed
-                            })
-                        # Handle regular map areas
-                        elif area_name.startswith('Map'):
-                            # Extract map name and boss status
-                            # Format is "Map<name>_NoBoss" or "Map<name>"
-                            map_parts = area_name.split('_')
-                            # Remove "Map" prefix and add spaces before capital letters (except first letter)
-                            raw_name = map_parts[0][3:]  # Remove "Map" prefix
-                            map_name = re.sub(r'(?<!^)(?=[A-Z])', ' ', raw_name)
-                            
-                            # Check for maps that never have bosses
-                            is_tower_map = area_name in self.NO_BOSS_MAPS
-                            has_boss = not (len(map_parts) > 1 and map_parts[1] == 'NoBoss' or is_tower_map)
-                            
-                            # Append (Tower) to special maps
-                            if is_tower_map:
-                                map_name = f"{map_name} (Tower)"
-                            
-                            # Map start event
-                            events.append({
-                                'type': 'map_start',
-                                'timestamp': timestamp,
-                                'map_name': map_name,
-                                'map_level': area_level,
-                                'has_boss': has_boss,
-                                'seed': seed
-                            })
-                        else:
-                            # Any non-map area counts as a map end event
-                            events.append({
-                                'type': 'map_end',
-                                'timestamp': timestamp,
-                                'next_area': area_name
-                            })
+        self._open_log(stat)
+        for matcher, raw_line in self._read_marker_lines():
+            event = self.parse_raw_line(matcher, raw_line)
+            if event:
+                yield event
+        if self.index:
+            self.index.update()
+            
+    def events_between(self, start, end):
+        """Yield the events logged between two datetimes, reading only that part of the log"""
+        index = self.index or self._create_index()
+        for _, raw_line in index.iter_lines(start, end):
+            for matcher, line in self.iter_marker_lines(raw_line, len(raw_line)):
+                event = self.parse_raw_line(matcher, line)
+                if event:
+                    yield event
+                
+    def scan_history(self, stats=None):
+        """Yield events for the whole log from the beginning, in constant memory.
+        
+        Uses its own file handle, so the tail position is left untouched. If a
+        stats dict is given, its 'bytes' and 'lines' counts are kept up to date
+        as the scan progresses.
+        """
+        if stats is not None:
+            stats.setdefault('bytes', 0)
+            stats.setdefault('lines', 0)
+        partial = b''
+        with open(self.log_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if stats is not None:
+                    stats['bytes'] += len(chunk)
+                data = partial + chunk if partial else chunk
+                end = data.rfind(b'\n')
+                if end == -1:
+                    partial = data
+                    continue
+                partial = data[end + 1:]
+                if stats is not None:
+                    stats['lines'] += data.count(b'\n', 0, end + 1)
+                for matcher, raw_line in self.iter_marker_lines(data, end):
+                    event = self.parse_raw_line(matcher, raw_line)
+                    if event:
+                        yield event
                         
-        self.last_position = current_size
-        return events
+        # The history is complete, so a last line without a newline still counts
+        if partial:
+            if stats is not None:
+                stats['lines'] += 1
+            for matcher, raw_line in self.iter_marker_lines(partial, len(partial)):
+                event = self.parse_raw_line(matcher, raw_line)
+                if event:
+                    yield event
+                    
+    def classify_area(self, area_name):
+        """Return (map_name, has_boss, kind) for an area id, map_name is None for non-map areas"""
+        cached = self._area_cache.get(area_name)
+        if cached is not None:
+            return cached
+            
+        result = (None, False, 'area')
+        for prefix, kind, name_format, has_boss in self.AREA_RULES:
+            if not area_name.startswith(prefix):
+                continue
+            if name_format is None:
+                result = (None, has_boss, kind)
+                break
+            raw_name = area_name[len(prefix):]
+            map_name = name_format.format(
+                raw=raw_name,
+                spaced=self._CAMEL_SPLIT.sub(' ', raw_name),
+                base=self._CAMEL_SPLIT.sub(' ', raw_name.split('_')[0])
+            )
+            if has_boss is None:
+                # Boss decided by the area id: "<name>_NoBoss" or a NO_BOSS_MAPS entry
+                has_boss = not (area_name.split('_')[1:2] == ['NoBoss'] or area_name in self.NO_BOSS_MAPS)
+            if area_name in self.NO_BOSS_MAPS:
+                map_name = f"{map_name} (Tower)"
+            result = (sys.intern(map_name), has_boss, kind)
+            break
+            
+        self._area_cache[area_name] = result
+        return result
+        
+    def parse_line(self, line):
+        """Parse a single log line into an event, or None if no matcher handles it"""
+        for matcher in self.matchers:
+            if matcher.text in line:
+                event = matcher.parse(self, line)
+                if event:
+                    return event
+        return None
+        
+    def _level_event(self, match):
+        """map_start or map_end for a "Generating level" line"""
+        timestamp = parse_log_timestamp(match.group(1))
+        area_name = match.group(3)
+        map_name, has_boss, kind = self.classify_area(area_name)
+        
+        if map_name is None:
+            # Any non-map area counts as a map end event
+            return MapEnd(timestamp, area_name, kind)
+        return MapStart(timestamp, map_name, int(match.group(2)), has_boss, int(match.group(4)))
+        
+    def _instance_event(self, match):
+        """The client connecting to an instance server, logged before the area is generated"""
+        return InstanceConnect(parse_log_timestamp(match.group(1)), match.group(2))
+        
+    def _death_event(self, match):
+        return PlayerDeath(parse_log_timestamp(match.group(1)), match.group(2))
+        
+    def _level_up_event(self, match):
+        return LevelUp(parse_log_timestamp(match.group(1)),
+                       match.group(2), match.group(3), int(match.group(4)))
+        
+    # Kinds of lines turned into events. Only lines containing one of the
+    # markers are decoded, so a new matcher costs one more byte search per
+    # chunk rather than another pass over decoded lines.
+    MATCHERS = (
+        LogMatcher('area', 'Generating level',
+                   TIMESTAMP_PATTERN + r'.*level (\d+) area "([^"]+)" with seed (\d+)', _level_event),
+        LogMatcher('instance', 'Connecting to instance server at ',
+                   TIMESTAMP_PATTERN + r'.*Connecting to instance server at (\S+)', _instance_event),
+        # System messages start with "] : ", unlike chat
+        LogMatcher('death', ' has been slain.',
+                   TIMESTAMP_PATTERN + r'.*\] : (\S+) has been slain\.', _death_event),
+        LogMatcher('level_up', ' is now level ',
+                   TIMESTAMP_PATTERN + r'.*\] : (\S+) \(([^)]+)\) is now level (\d+)', _level_up_event),
+    )
+    
\ No newline at end of file
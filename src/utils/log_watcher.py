@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+from .log_ingest import PollBackend, InotifyBackend, LogIngestWorker
+
+
+class QtNotifyBackend:
+    """Backend fed by QFileSystemWatcher on the UI thread, with a stat safety net
+
+    QFileSystemWatcher often misses appends while the game holds Client.txt
+    open on Windows, so the safety net is what finds most changes there and
+    its interval bounds the detection latency.
+    """
+    name = 'qt'
+
+    def __init__(self, path, safety_interval=0.5):
+        self.path = path
+        self._event = threading.Event()
+        self._poll = PollBackend(path, interval=0)
+        self._safety_interval = safety_interval
+        self._last_check = time.monotonic()
+        self._watcher = QFileSystemWatcher([str(path)])
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+    def _on_file_changed(self, path):
+        # The watch is dropped when the file is replaced, so re-add it
+        if path not in self._watcher.files() and os.path.exists(path):
+            self._watcher.addPath(path)
+        self._event.set()
+
+    def wait(self, timeout):
+        """Block up to timeout seconds, return True if the log changed"""
+        if self._event.wait(timeout):
+            self._event.clear()
+            self._poll.wait(0)  # Keep the safety net's snapshot current
+            return True
+        # Some platforms only report changes once the writer flushes metadata
+        now = time.monotonic()
+        if now - self._last_check >= self._safety_interval:
+            self._last_check = now
+            return self._poll.wait(0)
+        return False
+
+    def close(self):
+        self._watcher.removePaths(self._watcher.files())
+
+
+def create_backend(path, backend='auto', poll_interval=0.25, safety_interval=0.5):
+    """Create the requested watch backend, falling back when it is unavailable"""
+    if backend in ('auto', 'inotify') and InotifyBackend.available():
+        try:
+            return InotifyBackend(path)
+        except OSError:
+            pass
+    if backend in ('auto', 'qt'):
+        return QtNotifyBackend(path, safety_interval)
+    return PollBackend(path, interval=poll_interval)
+
+
+class LogWatcher(QObject):
+    """Runs log ingestion off the UI thread and delivers LogParser events to it
+
+    The ingest worker owns the parser and its file handle. The UI thread only
+    drains the worker's queue, a batch at a time, when it is told events are
+    available.
+    """
+    events_ready = pyqtSignal(list)
+    _events_available = pyqtSignal()
+
+    DRAIN_BATCH = 200  # Events handled per UI slot before yielding to the event loop
+
+    def __init__(self, log_parser, debounce_ms=50, backend='auto', poll_interval=0.25,
+                 safety_interval=0.5, max_queue=1000, parent=None):
+        super().__init__(parent)
+        self.log_parser = log_parser
+        self.debounce_ms = debounce_ms
+        self.backend_name = backend
+        self.poll_interval = poll_interval
+        self.safety_interval = safety_interval
+        self.max_queue = max_queue
+        self.backend = None
+        self.worker = None
+        # (event type, seconds from the log being written to the event being delivered)
+        self.latencies = deque(maxlen=1000)
+        # Last events delivered, kept for diagnostics
+        self.recent_events = deque(maxlen=500)
+        self._drain_scheduled = False
+        self._events_available.connect(self._drain)
+
+    def start(self):
+        if self.worker is not None:
+            return
+        self.backend = create_backend(self.log_parser.log_path, self.backend_name,
+                                      self.poll_interval, self.safety_interval)
+        self.worker = LogIngestWorker(
+            self.log_parser,
+            self.backend,
+            max_queue=self.max_queue,
+            debounce=self.debounce_ms / 1000,
+            on_events=self._events_available.emit
+        )
+        self.worker.start()
+
+    def stop(self):
+        if self.worker is None:
+            return
+        self.worker.stop()
+        self.worker = None
+        self.backend.close()
+        self.backend = None
+
+    def _drain(self):
+        self._drain_scheduled = False
+        if self.worker is None:
+            return
+        items = self.worker.drain(self.DRAIN_BATCH)
+        if not items:
+            return
+        now = time.time()
+        events = []
+        for event, written_at in items:
+            if written_at is not None:
+                self.latencies.append((event['type'], max(0.0, now - written_at)))
+            events.append(event)
+        self.recent_events.extend(events)
+        self.events_ready.emit(events)
+        # Leave the rest for the next event loop pass so the window stays responsive
+        if not self.worker.queue.empty() and not self._drain_scheduled:
+            self._drain_scheduled = True
+            QTimer.singleShot(0, self._drain)
+
+    def latency_stats(self):
+        """Summarize recorded detection latencies in seconds"""
+        values = sorted(latency for _, latency in self.latencies)
+        if not values:
+            return {'count': 0, 'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max': values[-1]
+        }
+
+    def metrics(self):
+        """Queue backpressure metrics of the running worker"""
+        return self.worker.metrics() if self.worker else {}
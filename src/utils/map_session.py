@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+
+class MapSession:
+    """Tracks a single map instance across hideout visits
+
+    Shared by the live tracker and the Client.txt backfill so both split
+    map runs the same way: re-entering an instance with the same seed
+    continues the run, a trip to the hideout pauses it, and going
+    anywhere else ends it.
+    """
+
+    def __init__(self, character=None):
+        self.character = character  # Name whose deaths are counted, None counts every death
+        self.reset()
+
+    def reset(self):
+        self.start_event = None  # map_start event of the current segment
+        self.started_at = None  # Timestamp of the first entry into the instance
+        self.seed = None
+        self.duration = timedelta()
+        self.paused = False
+        self.deaths = 0
+
+    @property
+    def active(self):
+        return self.start_event is not None
+
+    def enter(self, event):
+        """Handle a map_start event, return True if it continues the current instance"""
+        seed = event.get('seed')
+        continued = bool(self.seed) and seed == self.seed
+        if not continued:
+            # Starting fresh map instance
+            self.seed = seed
+            self.started_at = event['timestamp']
+            self.duration = timedelta()
+            self.deaths = 0
+        self.start_event = event
+        self.paused = False
+        return continued
+
+    def leave(self, event):
+        """Handle a map_end event, return True if the map is only paused in the hideout"""
+        if not self.paused:
+            # Time spent out of the map is not counted twice
+            self.duration += event['timestamp'] - self.start_event['timestamp']
+        self.paused = True
+        return event.get('area_kind') == 'hideout'
+
+    def record_death(self, event):
+        """Handle a player_death event, counted only while inside the map
+        
+        Deaths of other characters, e.g. party members, are ignored when the
+        tracked character is known.
+        """
+        if self.character and event.get('character') != self.character:
+            return
+        if self.active and not self.paused:
+            self.deaths += 1
+
+    def elapsed(self, now):
+        """Total time in the instance, including the segment in progress"""
+        if self.paused:
+            return self.duration
+        return self.duration + (now - self.start_event['timestamp'])
+
+    def to_run(self):
+        """Summary of the finished instance for storing as a map run"""
+        return {
+            'map_name': self.start_event['map_name'],
+            'map_level': self.start_event['map_level'],
+            'has_boss': self.start_event['has_boss'],
+            'start_time': self.started_at,
+            'duration': int(self.duration.total_seconds()),
+            'deaths': self.deaths,
+            'completion_status': 'rip' if self.deaths else 'complete'
+        }
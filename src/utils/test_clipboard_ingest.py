@@ -0,0 +1,53 @@
+import threading
+import unittest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.clipboard_ingest import ClipboardIngestor
+from src.utils.item_parser import ItemParser
+
+CURRENCY = """Item Class: Stackable Currency
+Rarity: Currency
+Exalted Orb
+--------
+Stack Size: {}/20"""
+
+RING = """Item Class: Rings
+Rarity: Unique
+Andvarius
+Gold Ring"""
+
+class TestClipboardIngestor(unittest.TestCase):
+    def setUp(self):
+        self.ready = threading.Event()
+        self.ingestor = ClipboardIngestor(ItemParser(), on_ready=self.ready.set)
+        self.addCleanup(self.ingestor.stop)
+
+    def test_items_are_totalled_by_name(self):
+        for text in (CURRENCY.format(2), RING, CURRENCY.format(3)):
+            self.assertTrue(self.ingestor.feed(text))
+        changed = self.ingestor.drain(wait=True)
+
+        self.assertEqual(changed, ['Exalted Orb_Currency', 'Andvarius', 'Exalted Orb_Currency'])
+        self.assertEqual({name: item['stack_size'] for name, item in self.ingestor.items.items()},
+                         {'Exalted Orb_Currency': 5, 'Andvarius': 1})
+        self.assertTrue(self.ready.wait(5))
+
+    def test_same_copy_twice_in_a_row_counts_once(self):
+        self.assertTrue(self.ingestor.feed(RING))
+        self.assertFalse(self.ingestor.feed(RING))
+        self.assertFalse(self.ingestor.feed(''))
+        self.assertTrue(self.ingestor.feed(CURRENCY.format(1)))
+        self.assertTrue(self.ingestor.feed(RING))  # Not consecutive any more
+        self.ingestor.drain(wait=True)
+
+        self.assertEqual(self.ingestor.items['Andvarius']['stack_size'], 2)
+
+    def test_drain_keeps_copies_in_order(self):
+        self.ingestor.feed(RING)
+        self.ready.wait(5)
+        self.assertEqual(self.ingestor.drain(), ['Andvarius'])
+        self.assertEqual(self.ingestor.drain(), [])
+
+if __name__ == '__main__':
+    unittest.main()
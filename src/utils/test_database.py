@@ -0,0 +1,419 @@
+import importlib.util
+import json
+import sqlite3
+import unittest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.database import Database
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = Path("test_database.db")
+        self.db = Database(str(self.test_db_path))
+
+    def tearDown(self):
+        self.db.conn.close()
+        if self.test_db_path.exists():
+            self.test_db_path.unlink()
+
+    def add_run(self, start_time, items):
+        self.db.add_map_run('Hidden Grotto', 65, 1, start_time, 300, items)
+        return self.db.conn.execute('SELECT MAX(id) FROM map_runs').fetchone()[0]
+
+    def test_items_are_combined_by_name(self):
+        run_id = self.add_run('2025-01-30 18:00:00', [
+            {'name': 'Exalted Orb_Currency', 'stack_size': 2, 'rarity': 'Currency', 'item_class': 'Stackable Currency'},
+            {'name': 'Rarity: Rare', 'stack_size': 1}
+        ])
+        self.db.add_items_to_map(run_id, [
+            {'name': 'Exalted Orb_Currency', 'stack_size': 3, 'rarity': 'Currency', 'item_class': 'Stackable Currency'},
+            {'name': 'Gold Ring', 'stack_size': 1, 'rarity': 'Rare', 'item_class': 'Rings'}
+        ])
+
+        run = self.db.get_map_runs()[0]
+        self.assertEqual(run['items'], [
+            {'name': 'Exalted Orb_Currency', 'stack_size': 5, 'rarity': 'Currency', 'item_class': 'Stackable Currency'},
+            {'name': 'Gold Ring', 'stack_size': 1, 'rarity': 'Rare', 'item_class': 'Rings'}
+        ])
+
+    def test_item_aggregates(self):
+        first = self.add_run('2025-01-30 18:00:00', [{'name': 'Exalted Orb_Currency', 'stack_size': 2}])
+        second = self.add_run('2025-01-30 18:10:00', [
+            {'name': 'Exalted Orb_Currency', 'stack_size': 4},
+            {'name': 'Chaos Orb_Currency', 'stack_size': 1},
+            {'name': 'Gold Ring', 'stack_size': 1}
+        ])
+
+        self.assertEqual(self.db.get_item_totals('_Currency'), {'Exalted Orb_Currency': 6, 'Chaos Orb_Currency': 1})
+        self.assertEqual(self.db.get_item_totals()['Gold Ring'], 1)
+        self.assertEqual(self.db.get_item_count_by_run('Exalted Orb_Currency'), {first: 2, second: 4})
+
+        self.db.delete_map_run(second)
+        self.assertEqual(self.db.get_item_count_by_run('Exalted Orb_Currency'), {first: 2})
+
+    def test_summary_columns_follow_items(self):
+        run_id = self.add_run('2025-01-30 18:00:00', [
+            {'name': 'Exalted Orb_Currency', 'stack_size': 2},
+            {'name': 'Gold Ring', 'stack_size': 1}
+        ])
+        self.db.add_items_to_map(run_id, [
+            {'name': 'Exalted Orb_Currency', 'stack_size': 3},
+            {'name': 'Divine Orb_Currency', 'stack_size': 1},
+            {'name': 'Rarity: Rare', 'stack_size': 1}
+        ])
+        empty_id = self.add_run('2025-01-30 18:10:00', [])
+
+        runs = {run['id']: run for run in self.db.query_runs(with_items=False)}
+        self.assertIsNone(runs[run_id]['items'])  # Only the legacy JSON column
+        self.assertEqual(
+            {column: runs[run_id][column] for column in self.db.SUMMARY_COLUMNS},
+            {'item_count': 3, 'total_stack': 7, 'exalted_orbs': 5, 'divine_orbs': 1, 'chaos_orbs': 0, 'regal_orbs': 0}
+        )
+        self.assertEqual(runs[empty_id]['item_count'], 0)
+        self.assertEqual(len(self.db.get_run_items(run_id)), 3)
+
+    def test_summary_columns_are_backfilled(self):
+        run_id = self.add_run('2025-01-30 18:00:00', [{'name': 'Chaos Orb_Currency', 'stack_size': 4}])
+        # An older database, without the summary columns or rollups
+        for trigger in ('insert', 'delete', 'update'):
+            self.db.conn.execute(f'DROP TRIGGER map_runs_rollup_{trigger}')
+        self.db.conn.execute('DROP TABLE run_rollups')
+        for column in self.db.SUMMARY_COLUMNS:
+            self.db.conn.execute(f'ALTER TABLE map_runs DROP COLUMN {column}')
+        self.db.conn.commit()
+        self.db.conn.close()
+
+        self.db = Database(str(self.test_db_path))
+        run = self.db.get_map_runs()[0]
+        self.assertEqual((run['id'], run['item_count'], run['total_stack'], run['chaos_orbs']), (run_id, 1, 4, 4))
+        self.assertEqual(self.db.rollup_stats()[0]['chaos_orbs'], 4)
+
+    def test_rollups_follow_runs(self):
+        character_id = self.db.add_character('Wanderer', 'Monk')
+        for i in range(30):
+            self.db.add_map_run(f'Map {i % 3}', 65 + i % 4, i % 3, f'2025-01-{1 + i % 5:02d} 18:{i:02d}:00', 60 + i,
+                                [{'name': 'Exalted Orb_Currency', 'stack_size': i % 4}] if i % 4 else [],
+                                completion_status='rip' if i % 7 == 0 else 'complete', has_breach=i % 2 == 0,
+                                has_ritual=i % 3 == 0, breach_count=i % 2, character_id=character_id if i % 2 else None)
+        runs = self.db.get_map_runs()
+        self.db.add_items_to_map(runs[0]['id'], [{'name': 'Divine Orb_Currency', 'stack_size': 2}])
+        self.db.delete_map_run(runs[1]['id'])
+        self.db.conn.execute("UPDATE map_runs SET map_level = 80, has_delirium = 1 WHERE id = ?", (runs[2]['id'],))
+
+        # Rollups match totals computed from the runs themselves
+        runs = self.db.get_map_runs()
+        by_map = {row['map_name']: row for row in self.db.rollup_stats(('map_name',))}
+        self.assertEqual(set(by_map), {'Map 0', 'Map 1', 'Map 2'})
+        for map_name, row in by_map.items():
+            map_runs = [run for run in runs if run['map_name'] == map_name]
+            self.assertEqual(row['runs'], len(map_runs))
+            self.assertEqual(row['rips'], sum(run['completion_status'] == 'rip' for run in map_runs))
+            self.assertEqual(row['duration_sum'], sum(run['duration'] for run in map_runs))
+            self.assertEqual(row['boss_sum'], sum(run['boss_count'] for run in map_runs))
+            self.assertEqual(row['exalted_orbs'], sum(run['exalted_orbs'] for run in map_runs))
+            self.assertEqual(row['max_level'], max(run['map_level'] for run in map_runs))
+
+        breach_ritual = self.db.rollup_stats(filters={'mechanics': ['breach', 'ritual']})[0]
+        self.assertEqual(breach_ritual['runs'], sum(1 for run in runs if run['has_breach'] and run['has_ritual']))
+        characters = {row['character_id']: row['runs'] for row in self.db.rollup_stats(('character_id',))}
+        self.assertEqual(characters, {0: sum(1 for run in runs if run['character_id'] is None),
+                                      character_id: sum(1 for run in runs if run['character_id'] == character_id)})
+        self.assertEqual(self.db.rollup_stats(filters={'map_name': 'Nowhere'}), [])
+
+        self.db.clear_database()
+        self.assertEqual(self.db.conn.execute('SELECT COUNT(*) FROM run_rollups').fetchone()[0], 0)
+
+    def test_json_items_are_migrated(self):
+        run_id = self.add_run('2025-01-30 18:00:00', [])
+        items = [{'name': 'Divine Orb_Currency', 'stack_size': 1, 'rarity': 'Currency', 'item_class': None}]
+        self.db.conn.execute('UPDATE map_runs SET items = ? WHERE id = ?', (json.dumps(items), run_id))
+        self.db.conn.commit()
+        self.db.conn.close()
+
+        # Reopening runs update_schema, which moves the JSON into map_run_items
+        self.db = Database(str(self.test_db_path))
+        self.assertEqual(self.db.get_map_runs()[0]['items'], items)
+        self.assertEqual(self.db.get_map_runs()[0]['divine_orbs'], 1)
+        self.assertIsNone(self.db.conn.execute('SELECT items FROM map_runs').fetchone()[0])
+
+        # Migrating again does not duplicate anything
+        self.db.conn.close()
+        self.db = Database(str(self.test_db_path))
+        self.assertEqual(self.db.get_item_count_by_run('Divine Orb_Currency'), {run_id: 1})
+
+    def test_many_json_runs_are_migrated(self):
+        # One query parameter per run would pass SQLite's limit on parameters
+        count = Database.ITEM_LOOKUP_BATCH * 2 + 1
+        items = json.dumps([{'name': 'Divine Orb_Currency', 'stack_size': 1}])
+        with self.db.transaction():
+            for i in range(count):
+                run_id = self.add_run('2025-01-30 18:00:00', [])
+                self.db.conn.execute('UPDATE map_runs SET items = ? WHERE id = ?', (items, run_id))
+        self.db.conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, Database.ITEM_LOOKUP_BATCH)
+
+        self.db.update_schema()
+        self.assertEqual(self.db.conn.execute('SELECT SUM(divine_orbs) FROM map_runs').fetchone()[0], count)
+
+    def test_query_runs_filters_and_pages(self):
+        character_id = self.db.add_character('Wanderer', 'Monk')
+        for i in range(25):
+            self.db.add_map_run(f'Map {i % 3}', 65 + i % 5, i % 3, f'2025-01-30 18:{i:02d}:00', 60 + i, [],
+                                completion_status='rip' if i % 5 == 0 else 'complete',
+                                has_breach=i % 2 == 0, character_id=character_id if i < 20 else None)
+
+        filters = {'character_id': character_id, 'mechanics': ['breach']}
+        expected = [run for run in self.db.get_map_runs() if run['character_id'] == character_id and run['has_breach']]
+        pages = [self.db.query_runs(filters, limit=4, offset=offset) for offset in range(0, 12, 4)]
+        self.assertEqual([len(page) for page in pages], [4, 4, 2])
+        self.assertEqual([run['id'] for page in pages for run in page], [run['id'] for run in expected])
+        self.assertEqual(self.db.query_runs(filters, order='duration ASC')[0]['duration'], 60)
+        with self.assertRaises(ValueError):
+            self.db.query_runs(order='items; DROP TABLE map_runs')
+
+        stats = self.db.run_stats(filters)
+        self.assertEqual(stats['total'], 10)
+        self.assertEqual(stats['rips'], 2)  # Runs 0 and 10
+        self.assertEqual(stats['complete'], 8)
+        self.assertEqual(stats['single_bosses'], sum(1 for run in expected if run['boss_count'] == 1))
+        self.assertEqual(stats['twin_bosses'], sum(1 for run in expected if run['boss_count'] == 2))
+        self.assertAlmostEqual(stats['avg_duration'], sum(run['duration'] for run in expected) / 10)
+        self.assertEqual(self.db.run_stats({'map_name': 'Nowhere'})['avg_duration'], 0)
+
+    def test_runs_carry_character_and_build(self):
+        character_id = self.db.add_character('Wanderer', 'Monk', ascendancy='Invoker')
+        build_id = self.db.add_build(character_id, 'Tempest Flurry', 'https://example.com/build')
+        self.db.set_current_build(character_id, build_id)
+        self.db.add_map_run('Hidden Grotto', 65, 1, '2025-01-30 18:00:00', 300, [], character_id=character_id)
+        self.add_run('2025-01-30 18:10:00', [])
+
+        # Newest first: the run without a character, then the one with it
+        bare, joined = self.db.get_map_runs()
+        self.assertIsNone(bare['character_name'])
+        self.assertIsNone(bare['build_name'])
+        self.assertEqual(joined['character_name'], 'Wanderer')
+        self.assertEqual(joined['character_ascendancy'], 'Invoker')
+        self.assertEqual(joined['build_name'], 'Tempest Flurry')
+        self.assertEqual(joined['build_url'], 'https://example.com/build')
+
+    def test_character_and_build_cache(self):
+        character_id = self.db.add_character('Wanderer', 'Monk')
+        build_id = self.db.add_build(character_id, 'Tempest Flurry', '')
+
+        character = self.db.get_character(character_id)
+        character['name'] = 'Changed by caller'
+        self.assertEqual(self.db.get_character(character_id)['name'], 'Wanderer')
+        self.assertIn(character_id, self.db._characters)
+
+        self.db.update_character(character_id, level=90)
+        self.assertEqual(self.db.get_character(character_id)['level'], 90)
+        self.db.set_current_build(character_id, build_id)
+        self.assertEqual(self.db.get_character(character_id)['current_build_id'], build_id)
+
+        self.assertEqual(self.db.get_build(build_id)['name'], 'Tempest Flurry')
+        self.db.update_build(build_id, name='Ice Strike')
+        self.assertEqual(self.db.get_build(build_id)['name'], 'Ice Strike')
+
+        self.db.delete_build(build_id)
+        self.assertIsNone(self.db.get_build(build_id))
+        self.assertIsNone(self.db.get_character(character_id)['current_build_id'])
+
+    def test_connection_profile(self):
+        self.assertEqual(self.db.conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(self.db.conn.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+        self.assertEqual(self.db.conn.execute('PRAGMA temp_store').fetchone()[0], 2)  # MEMORY
+
+    def test_transaction_commits_once(self):
+        reader = sqlite3.connect(str(self.test_db_path))
+        count = lambda: reader.execute('SELECT COUNT(*) FROM map_runs').fetchone()[0]
+        try:
+            with self.db.transaction():
+                self.add_run('2025-01-30 18:00:00', [{'name': 'Gold Ring', 'stack_size': 1}])
+                with self.db.transaction():
+                    self.add_run('2025-01-30 18:10:00', [])
+                self.db.add_items_to_latest_map([{'name': 'Gold Ring', 'stack_size': 1}])
+                # Nothing is visible to other connections until the outer block ends
+                self.assertEqual(count(), 0)
+            self.assertEqual(count(), 2)
+            self.assertEqual(self.db.get_item_totals(), {'Gold Ring': 2})
+
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction():
+                    self.add_run('2025-01-30 18:20:00', [])
+                    raise RuntimeError
+            self.assertEqual(count(), 2)
+            self.assertEqual(len(self.db.get_map_runs()), 2)
+            
+            # An item name first stored in a rolled back block can still be logged later
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction():
+                    self.db.add_items_to_latest_map([{'name': 'Divine Orb', 'stack_size': 1}])
+                    raise RuntimeError
+            self.db.add_items_to_latest_map([{'name': 'Divine Orb', 'stack_size': 1}])
+            self.assertEqual(self.db.get_item_totals()['Divine Orb'], 1)
+        finally:
+            reader.close()
+
+    def test_csv_round_trip(self):
+        character_id = self.db.add_character('Wanderer', 'Monk', 90, 'Invoker')
+        build_id = self.db.add_build(character_id, 'Tempest Flurry', 'https://example.com/build')
+        self.db.set_current_build(character_id, build_id)
+        for i in range(12):
+            self.db.add_map_run(f'Map {i % 3}', 65 + i % 4, i % 3, f'2025-01-30 18:{i:02d}:00', 60 + i,
+                                [{'name': 'Exalted Orb_Currency', 'stack_size': i + 1},
+                                 {'name': 'Ring, of Commas', 'stack_size': 1}] if i % 2 else [],
+                                completion_status='rip' if i % 5 == 0 else 'complete', has_breach=i % 2 == 0,
+                                breach_count=i % 2, character_id=character_id)
+        export_path = Path('test_database_export.csv')
+        files = [Path(str(export_path).replace('.csv', suffix)) for suffix in ('_characters.csv', '_maps.csv', '_builds.csv')]
+        self.addCleanup(lambda: [path.unlink() for path in files if path.exists()])
+        self.db.export_to_csv(str(export_path))
+        expected = self.db.get_map_runs()
+        expected_rollups = self.db.rollup_stats(('map_name', 'character_id'))
+
+        # Ids are already taken, so nothing is written
+        with self.assertRaises(ValueError) as raised:
+            self.db.import_from_csv(*map(str, files))
+        self.assertIn('already in the database', str(raised.exception))
+        self.assertEqual(len(self.db.get_map_runs()), 12)
+
+        self.db.clear_database()
+        self.assertEqual(self.db.import_from_csv(*map(str, files), dry_run=True)['runs'], 12)
+        self.assertEqual(self.db.get_map_runs(), [])
+
+        progress = []
+        self.db.CSV_IMPORT_BATCH = 5
+        stats = self.db.import_from_csv(*map(str, files), on_progress=lambda stats: progress.append(stats['rows']))
+        self.assertEqual((stats['characters'], stats['builds'], stats['runs'], stats['items']), (1, 1, 12, 12))
+        self.assertEqual(stats['rows'], 26)
+        self.assertEqual(progress, sorted(progress))
+        self.assertGreater(len(progress), 3)  # Reported per batch
+
+        for run in expected:
+            # The export has no value, rarity or item class
+            run['value'] = None
+            run['items'] = [dict(item, rarity=None, item_class=None) for item in run['items']]
+        self.assertEqual(self.db.get_map_runs(), expected)
+        self.assertEqual(self.db.rollup_stats(('map_name', 'character_id')), expected_rollups)
+        self.assertEqual(self.db.get_character(character_id)['current_build_id'], build_id)
+        # The indexes and triggers dropped for the load are back
+        self.assertEqual(self.db.conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0], 3)
+        for name in self.db.INDEXES:
+            self.assertIsNotNone(self.db.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone())
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow is not installed")
+    def test_parquet_export(self):
+        import pyarrow.parquet as pq
+        character_id = self.db.add_character('Wanderer', 'Monk')
+        first = self.add_run('2025-01-30 18:00:00', [{'name': 'Exalted Orb_Currency', 'stack_size': 2, 'rarity': 'Currency'},
+                                                     {'name': 'Gold Ring', 'stack_size': 1}])
+        self.db.add_map_run('Hidden Grotto', 66, 0, '2025-01-30 18:10:00', 200, [], has_breach=True,
+                            character_id=character_id)
+        self.db.EXPORT_BATCH = 1  # Several record batches per file
+        paths = self.db.export_to_parquet('test_database_export.parquet')
+        self.addCleanup(lambda: [Path(path).unlink() for path in paths if Path(path).exists()])
+
+        maps, items, characters, builds = (pq.read_table(path).to_pylist() for path in paths)
+        self.assertEqual([run['map_level'] for run in maps], [65, 66])
+        self.assertEqual([run['has_breach'] for run in maps], [False, True])
+        self.assertEqual(maps[0]['exalted_orbs'], 2)
+        self.assertNotIn('items', maps[0])
+        self.assertEqual([(item['run_id'], item['name'], item['stack_size']) for item in items],
+                         [(first, 'Exalted Orb_Currency', 2), (first, 'Gold Ring', 1)])
+        self.assertEqual(characters[0]['name'], 'Wanderer')
+        self.assertEqual(builds, [])
+        self.assertIn('url', pq.read_schema(paths[3]).names)
+
+    def test_csv_import_reports_bad_rows(self):
+        characters = Path('test_database_characters.csv')
+        maps = Path('test_database_maps.csv')
+        self.addCleanup(lambda: [path.unlink() for path in (characters, maps) if path.exists()])
+        characters.write_text('ID,Name,Level,Class,Ascendancy,Current Build ID\n1,Wanderer,90,Monk,,\n', encoding='utf-8')
+        maps.write_text(
+            'ID,Map Name,Map Level,Boss Count,Start Time,Duration,Items,Status,Has Breach,Has Delirium,'
+            'Has Expedition,Has Ritual,Breach Count,Character ID,Build ID\n'
+            '1,Hidden Grotto,65,1,2025-01-30 18:00:00,05:00,None,Complete,No,No,No,No,0,1,\n'
+            '2,Hidden Grotto,65,1,2025-01-30 18:10:00,05:00,None,Complete,No,No,No,No,0,7,\n'
+            '3,Hidden Grotto,sixty,1,2025-01-30 18:20:00,05:00,None,Complete,No,No,No,No,0,1,\n',
+            encoding='utf-8'
+        )
+        with self.assertRaises(ValueError) as raised:
+            self.db.import_from_csv(str(characters), str(maps))
+        message = str(raised.exception)
+        self.assertIn('line 3: unknown character 7', message)
+        self.assertIn('line 4', message)
+        self.assertEqual(self.db.get_characters(), [])
+
+    def test_failed_csv_import_keeps_indexes_and_triggers(self):
+        characters = Path('test_database_characters.csv')
+        maps = Path('test_database_maps.csv')
+        self.addCleanup(lambda: [path.unlink() for path in (characters, maps) if path.exists()])
+        characters.write_text('ID,Name,Level,Class,Ascendancy,Current Build ID\n1,Wanderer,90,Monk,,\n', encoding='utf-8')
+        maps.write_text(
+            'ID,Map Name,Map Level,Boss Count,Start Time,Duration,Items,Status,Has Breach,Has Delirium,'
+            'Has Expedition,Has Ritual,Breach Count,Character ID,Build ID\n'
+            '1,Hidden Grotto,65,1,2025-01-30 18:00:00,05:00,Gold Ring x1,Complete,No,No,No,No,0,1,\n',
+            encoding='utf-8'
+        )
+        
+        def schema():
+            return self.db.conn.execute(
+                "SELECT type, name FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name"
+            ).fetchall()
+            
+        def fail(stats):
+            raise RuntimeError("load interrupted")
+            
+        before = schema()
+        with self.assertRaises(RuntimeError):
+            self.db.import_from_csv(str(characters), str(maps), on_progress=fail)
+        self.assertEqual(schema(), before)
+        self.assertEqual(self.db.get_characters(), [])
+        
+        # The triggers still keep run_rollups up to date
+        self.db.add_map_run('Hidden Grotto', 65, 1, '2025-01-30 18:00:00', 300, [])
+        self.assertEqual(self.db.rollup_stats()[0]['runs'], 1)
+
+    def test_hot_queries_use_indexes(self):
+        # SQL behind the run list, its filters and item lookups, recorded from
+        # the real methods. Each must be answered from an index, never a full
+        # scan of the table.
+        character_id = self.db.add_character('Tester', 'Monk')
+        item = {'name': 'Exalted Orb_Currency', 'stack_size': 2, 'rarity': 'Currency', 'item_class': 'Stackable Currency'}
+        self.db.add_map_run('Hidden Grotto', 65, 1, '2025-01-30 18:00:00', 300, [item], character_id=character_id)
+
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            self.db.query_runs(limit=100)
+            self.db.query_runs({'character_id': character_id})
+            self.db.query_runs({'build_id': 1}, limit=100, with_items=False)
+            for mechanic in Database.MECHANICS:
+                self.db.query_runs({'mechanics': [mechanic]}, with_items=False)
+            self.db.query_runs({'character_id': character_id, 'mechanics': ['breach']}, with_items=False)
+            self.db.run_stats({'character_id': character_id, 'mechanics': ['ritual']})
+            runs = self.db.query_runs(with_items=False)
+            self.db._attach_items(self.db.conn.cursor(), runs)
+            self.db.get_item_count_by_run('Exalted Orb_Currency')
+            self.db.add_items_to_latest_map([item])
+            self.db.add_map_runs([{'map_name': 'Hidden Grotto', 'map_level': 65, 'has_boss': False,
+                                   'start_time': '2025-01-30 18:00:00', 'duration': 300}])
+        finally:
+            self.db.conn.set_trace_callback(None)
+
+        # Traced statements come with their parameters filled in
+        queries = [query for query in dict.fromkeys(statements)
+                   if query.split(None, 1)[0].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE')]
+        self.assertGreater(len(queries), 10)
+        for query in queries:
+            plan = self.db.conn.execute('EXPLAIN QUERY PLAN ' + query).fetchall()
+            for row in plan:
+                detail = row[3]
+                # "SCAN t USING INDEX ..." walks an index in order, plain "SCAN t" reads every row
+                self.assertFalse(detail.startswith('SCAN') and 'USING' not in detail and detail != 'SCAN CONSTANT ROW',
+                                 f"full table scan ({detail}) in: {query}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.database import Database
+from src.utils.db_writer import DatabaseWriter
+
+class TestDatabaseWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = Path("test_db_writer.db")
+        self.db = Database(str(self.test_db_path))  # The read connection
+        self.writer = DatabaseWriter(str(self.test_db_path))
+        self.writer.start()
+
+    def tearDown(self):
+        self.writer.stop()
+        self.db.conn.close()
+        for suffix in ('', '-wal', '-shm'):
+            path = Path(str(self.test_db_path) + suffix)
+            if path.exists():
+                path.unlink()
+
+    def add_run(self, start_time):
+        return self.writer.submit('add_map_run', 'Hidden Grotto', 65, 1, start_time, 300, [])
+
+    def test_futures_return_run_ids(self):
+        first = self.add_run('2025-01-30 18:00:00')
+        second = self.add_run('2025-01-30 18:10:00')
+        items = self.writer.submit('add_items_to_map', first.result(timeout=5),
+                                   [{'name': 'Gold Ring', 'stack_size': 1}])
+        items.result(timeout=5)
+
+        runs = {run['id']: run for run in self.db.get_map_runs()}
+        self.assertEqual(set(runs), {first.result(), second.result()})
+        self.assertEqual(runs[first.result()]['items'][0]['name'], 'Gold Ring')
+
+    def test_future_arguments_are_resolved_by_the_writer(self):
+        run = self.add_run('2025-01-30 18:00:00')
+        items = self.writer.submit('add_items_to_map', run, [{'name': 'Gold Ring', 'stack_size': 1}])
+        failed = self.writer.submit('add_map_run', 'Hidden Grotto')  # Missing arguments
+        orphan = self.writer.submit('add_items_to_map', failed, [{'name': 'Gold Ring', 'stack_size': 1}])
+        self.writer.flush(timeout=5)
+
+        self.assertIsNone(items.exception())
+        self.assertEqual(self.db.get_map_runs()[0]['items'][0]['name'], 'Gold Ring')
+        self.assertIsInstance(orphan.exception(), TypeError)
+
+    def test_stop_writes_everything_queued(self):
+        futures = [self.add_run(f'2025-01-30 18:{i:02d}:00') for i in range(50)]
+        self.writer.stop()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(len(self.db.get_map_runs()), 50)
+        with self.assertRaises(RuntimeError):
+            self.add_run('2025-01-30 19:00:00')
+
+    def test_failed_write_only_fails_its_own_future(self):
+        with self.assertRaises(AttributeError):
+            self.writer.submit('no_such_method')
+        good = self.add_run('2025-01-30 18:00:00')
+        bad = self.writer.submit('add_map_run', 'Hidden Grotto')  # Missing arguments
+        after = self.add_run('2025-01-30 18:10:00')
+        self.writer.flush(timeout=5)
+
+        self.assertIsInstance(bad.exception(), TypeError)
+        self.assertEqual(len(self.db.get_map_runs()), 2)
+        self.assertIsNone(good.exception())
+        self.assertIsNone(after.exception())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.item_parser import ItemCounts, ItemParser
+
+CURRENCY = """Item Class: Stackable Currency
+Rarity: Currency
+Exalted Orb
+--------
+Stack Size: 3/20"""
+
+RING = """Item Class: Rings
+Rarity: Rare
+Dusk Loop
+Gold Ring
+--------
+Item Level: 80"""
+
+class TestItemCounts(unittest.TestCase):
+    def setUp(self):
+        self.parser = ItemParser()
+
+    def test_items_are_grouped_by_category(self):
+        counts = self.parser.parse_counts(RING + '\n\n' + CURRENCY + '\n\n' + RING)
+        self.assertEqual(len(counts), 2)
+        self.assertEqual(counts.to_items(), [
+            {'item_class': 'Stackable Currency', 'rarity': 'Currency', 'name': 'Exalted Orb_Currency',
+             'stack_size': 3, 'display_rarity': 'Currency'},
+            {'item_class': 'Rings', 'rarity': 'Rare', 'name': 'Gold Ring', 'stack_size': 2, 'display_rarity': 'Rare'}
+        ])
+
+    def test_merge_totals_several_pastes(self):
+        session = ItemCounts()
+        session.merge(self.parser.parse_counts(CURRENCY))
+        snapshot = session.snapshot()
+        session.merge(self.parser.parse_counts(CURRENCY + '\n\n' + RING))
+        self.assertEqual({item['name']: item['stack_size'] for item in session.to_items()},
+                         {'Exalted Orb_Currency': 6, 'Gold Ring': 1})
+
+        # Snapshots are copies and merge like ItemCounts
+        self.assertEqual(ItemCounts(snapshot).merge(snapshot).to_items()[0]['stack_size'], 6)
+        session.clear()
+        self.assertEqual(session.to_items(), [])
+
+    def test_parse_items_keeps_no_state(self):
+        self.assertEqual(self.parser.parse_items(CURRENCY)[0]['stack_size'], 3)
+        self.assertEqual(self.parser.parse_items(CURRENCY)[0]['stack_size'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
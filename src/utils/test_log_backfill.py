@@ -0,0 +1,88 @@
+import unittest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.database import Database
+from src.utils.log_backfill import backfill_map_runs, reconstruct_runs
+from src.utils.log_parser import LogParser
+
+LOG_LINES = [
+    # Map with a hideout trip in the middle, then a second map left through town
+    '2025/01/30 18:00:00 1 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed 100\n',
+    '2025/01/30 18:02:00 1 2caa1679 [INFO Client 25000] Unrelated line\n',
+    '2025/01/30 18:05:00 1 2caa1679 [DEBUG Client 25000] Generating level 1 area "HideoutFelled" with seed 1\n',
+    '2025/01/30 18:07:00 1 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed 100\n',
+    '2025/01/30 18:10:00 1 2caa1679 [DEBUG Client 25000] Generating level 1 area "HideoutFelled" with seed 1\n',
+    '2025/01/30 18:11:00 1 2caa1679 [DEBUG Client 25000] Generating level 70 area "MapMesa" with seed 200\n',
+    '2025/01/30 18:13:00 1 2caa1679 [INFO Client 25000] : Wanderer has been slain.\n',
+    '2025/01/30 18:14:30 1 2caa1679 [DEBUG Client 25000] Generating level 15 area "G1_town" with seed 2\n',
+    # Still running when the log ends, so not imported
+    '2025/01/30 18:20:00 1 2caa1679 [DEBUG Client 25000] Generating level 75 area "MapCrimsonTemple" with seed 300'
+]
+
+class TestLogBackfill(unittest.TestCase):
+    def setUp(self):
+        self.test_log_path = Path("test_backfill_client.txt")
+        self.test_db_path = Path("test_backfill.db")
+        with open(self.test_log_path, 'w', encoding='utf-8') as f:
+            f.writelines(LOG_LINES)
+        self.db = Database(str(self.test_db_path))
+        
+    def tearDown(self):
+        self.db.conn.close()
+        for path in (self.test_log_path, self.test_db_path):
+            if path.exists():
+                path.unlink()
+                
+    def test_backfill_reconstructs_runs(self):
+        stats = backfill_map_runs(self.db, str(self.test_log_path))
+        self.assertEqual(stats['lines'], len(LOG_LINES))
+        self.assertEqual(stats['runs'], 2)
+        self.assertEqual(stats['inserted'], 2)
+        self.assertGreater(stats['lines_per_second'], 0)
+        
+        runs = sorted(self.db.get_map_runs(), key=lambda run: run['start_time'])
+        self.assertEqual(len(runs), 2)
+        
+        # Re-entered from the hideout, then ended by the next instance: 5 + 3 minutes
+        self.assertEqual(runs[0]['map_name'], 'Hidden Grotto')
+        self.assertEqual(runs[0]['duration'], 8 * 60)
+        self.assertEqual(runs[0]['start_time'], '2025-01-30 18:00:00')
+        
+        # Leaving for town ends the run right away
+        self.assertEqual(runs[1]['map_name'], 'Mesa (Tower)')
+        self.assertEqual(runs[1]['map_level'], 70)
+        self.assertEqual(runs[1]['duration'], 210)
+        # Died in the map, so it is stored as a RIP
+        self.assertEqual(runs[0]['completion_status'], 'complete')
+        self.assertEqual(runs[1]['completion_status'], 'rip')
+        
+    def test_backfill_skips_runs_already_imported(self):
+        backfill_map_runs(self.db, str(self.test_log_path))
+        stats = backfill_map_runs(self.db, str(self.test_log_path))
+        self.assertEqual(stats['runs'], 2)
+        self.assertEqual(stats['inserted'], 0)
+        self.assertEqual(len(self.db.get_map_runs()), 2)
+
+    def test_deaths_are_counted_per_map_and_character(self):
+        lines = [
+            '2025/01/30 18:00:00 1 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed 100\n',
+            '2025/01/30 18:01:00 1 2caa1679 [INFO Client 25000] : Wanderer has been slain.\n',
+            '2025/01/30 18:02:00 1 2caa1679 [DEBUG Client 25000] Generating level 1 area "HideoutFelled" with seed 1\n',
+            '2025/01/30 18:03:00 1 2caa1679 [DEBUG Client 25000] Generating level 70 area "MapMesa" with seed 200\n',
+            # A party member dying does not make the run a RIP
+            '2025/01/30 18:04:00 1 2caa1679 [INFO Client 25000] : Friend has been slain.\n',
+            '2025/01/30 18:05:00 1 2caa1679 [DEBUG Client 25000] Generating level 15 area "G1_town" with seed 2\n'
+        ]
+        with open(self.test_log_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        events = list(LogParser(str(self.test_log_path)).scan_history())
+        
+        runs = list(reconstruct_runs(events, 'Wanderer'))
+        self.assertEqual([(run['deaths'], run['completion_status']) for run in runs],
+                         [(1, 'rip'), (0, 'complete')])
+        # Without a character every death counts
+        self.assertEqual([run['deaths'] for run in reconstruct_runs(events)], [1, 1])
+
+if __name__ == '__main__':
+    unittest.main()
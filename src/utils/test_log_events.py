@@ -0,0 +1,47 @@
+import pickle
+import unittest
+from datetime import datetime
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.log_events import EventBatch, MapStart, MapEnd, PlayerDeath
+
+class TestLogEvents(unittest.TestCase):
+    def setUp(self):
+        self.events = [
+            MapStart(datetime(2025, 1, 30, 18, 0, 0), 'Hidden Grotto', 65, True, 100),
+            PlayerDeath(datetime(2025, 1, 30, 18, 2, 0), 'Wanderer'),
+            MapEnd(datetime(2025, 1, 30, 18, 3, 0), 'HideoutFelled', 'hideout'),
+            MapStart(datetime(2025, 1, 30, 18, 4, 0), 'Mesa (Tower)', 70, False, 200)
+        ]
+
+    def test_dict_style_access(self):
+        # Existing event['field'] call sites keep working
+        event = self.events[0]
+        self.assertEqual(event['type'], 'map_start')
+        self.assertEqual(event['map_name'], 'Hidden Grotto')
+        self.assertEqual(event.get('seed'), 100)
+        self.assertIsNone(event.get('next_area'))
+        self.assertIn('has_boss', event)
+        with self.assertRaises(KeyError):
+            event['next_area']
+        self.assertEqual(self.events[2].to_dict(), {
+            'type': 'map_end',
+            'timestamp': datetime(2025, 1, 30, 18, 3, 0),
+            'next_area': 'HideoutFelled',
+            'area_kind': 'hideout'
+        })
+        # No per-event dict
+        self.assertFalse(hasattr(event, '__dict__'))
+
+    def test_batch_keeps_order_and_columns(self):
+        batch = EventBatch.from_events(self.events)
+        self.assertEqual(len(batch), 4)
+        self.assertEqual(list(batch), self.events)
+        self.assertEqual(batch.column(MapStart, 'map_level'), [65, 70])
+
+        restored = pickle.loads(pickle.dumps(batch))
+        self.assertEqual(list(restored), self.events)
+
+if __name__ == '__main__':
+    unittest.main()
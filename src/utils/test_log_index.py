@@ -0,0 +1,106 @@
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.log_index import LogIndex
+from src.utils.log_parser import LogParser
+
+START = datetime(2025, 1, 30, 18, 0, 0)
+
+def log_line(when, text):
+    return f'{when:%Y/%m/%d %H:%M:%S} 1 2caa1679 [INFO Client 25000] {text}\n'
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_log_path = Path("test_index_client.txt")
+        self.test_index_path = Path("test_index_client.idx")
+        # One line every 10 seconds for an hour
+        with open(self.test_log_path, 'w', encoding='utf-8') as f:
+            for i in range(360):
+                f.write(log_line(START + timedelta(seconds=i * 10), f"line {i}"))
+        # A tiny stride so the small test log gets plenty of entries
+        self.index = LogIndex(self.test_log_path, self.test_index_path, stride=256)
+
+    def tearDown(self):
+        for path in (self.test_log_path, self.test_index_path):
+            if path.exists():
+                path.unlink()
+
+    def expected_lines(self, start, end):
+        with open(self.test_log_path, 'r', encoding='utf-8') as f:
+            return [
+                line.rstrip('\n') for line in f
+                if start <= datetime.strptime(line[:19], '%Y/%m/%d %H:%M:%S') <= end
+            ]
+
+    def test_range_query_matches_full_scan(self):
+        start = START + timedelta(minutes=12, seconds=5)
+        end = START + timedelta(minutes=20)
+        self.assertEqual(self.index.lines_between(start, end), self.expected_lines(start, end))
+
+        # Only the slice between the surrounding entries needs reading
+        begin, stop = self.index.byte_range(start, end)
+        self.assertGreater(begin, 0)
+        self.assertLess(stop - begin, self.test_log_path.stat().st_size // 2)
+
+    def test_index_is_persisted_and_extended(self):
+        self.index.update()
+        entries = len(self.index.keys)
+        self.assertGreater(entries, 10)
+
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            for i in range(360, 420):
+                f.write(log_line(START + timedelta(seconds=i * 10), f"line {i}"))
+
+        reloaded = LogIndex(self.test_log_path, self.test_index_path, stride=256)
+        self.assertEqual(len(reloaded.keys), entries)
+        reloaded.update()
+        self.assertGreater(len(reloaded.keys), entries)
+
+        start, end = START + timedelta(minutes=59), START + timedelta(minutes=65)
+        self.assertEqual(reloaded.lines_between(start, end), self.expected_lines(start, end))
+
+    def test_sidecar_is_written_for_new_entries_and_on_close(self):
+        # With a wide stride the log only has the entry at its start
+        self.index = LogIndex(self.test_log_path, self.test_index_path, stride=1024 * 1024)
+        self.index.update()
+        saved = self.test_index_path.read_bytes()
+
+        # A short append adds no entry, so tailing does not rewrite the sidecar
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write(log_line(START + timedelta(hours=1), "short"))
+        self.index.update()
+        self.assertEqual(self.test_index_path.read_bytes(), saved)
+
+        self.index.close()
+        reloaded = LogIndex(self.test_log_path, self.test_index_path, stride=1024 * 1024)
+        self.assertEqual(reloaded.indexed_size, self.test_log_path.stat().st_size)
+        self.assertEqual(reloaded.keys, self.index.keys)
+
+    def test_truncated_log_is_reindexed(self):
+        self.index.update()
+        later = START + timedelta(days=1)
+        with open(self.test_log_path, 'w', encoding='utf-8') as f:
+            f.write(log_line(later, "fresh log"))
+        self.assertEqual(self.index.lines_between(later, later), [log_line(later, "fresh log").rstrip('\n')])
+        self.assertEqual(self.index.lines_between(START, START + timedelta(hours=1)), [])
+
+    def test_parser_keeps_index_updated_while_tailing(self):
+        parser = LogParser(str(self.test_log_path), index_path=str(self.test_index_path))
+        try:
+            when = START + timedelta(hours=2)
+            with open(self.test_log_path, 'a', encoding='utf-8') as f:
+                f.write(f'{when:%Y/%m/%d %H:%M:%S} 1 2caa1679 [DEBUG Client 25000] '
+                        'Generating level 65 area "MapHiddenGrotto" with seed 100\n')
+            self.assertEqual(len(parser.check_updates()), 1)
+            self.assertEqual(parser.index.indexed_size, self.test_log_path.stat().st_size)
+
+            events = list(parser.events_between(when, when))
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0]['map_name'], 'Hidden Grotto')
+        finally:
+            parser.close()
+
+if __name__ == '__main__':
+    unittest.main()
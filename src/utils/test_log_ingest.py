@@ -0,0 +1,122 @@
+import unittest
+from pathlib import Path
+import sys
+import time
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from src.utils.log_parser import LogParser
+from src.utils.log_ingest import LogIngestWorker, PollBackend
+
+LINE = '2025/01/30 18:{:02d}:45 3802609 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed {}\n'
+
+class TestLogIngestWorker(unittest.TestCase):
+    def setUp(self):
+        self.test_log_path = Path("test_ingest_client.txt")
+        self.test_log_path.touch()
+        self.log_parser = LogParser(str(self.test_log_path))
+        self.worker = None
+        
+    def tearDown(self):
+        if self.worker:
+            self.worker.stop()
+        self.log_parser.close()
+        if self.test_log_path.exists():
+            self.test_log_path.unlink()
+            
+    def start_worker(self, max_queue=1000):
+        backend = PollBackend(str(self.test_log_path), interval=0.01)
+        self.worker = LogIngestWorker(self.log_parser, backend, max_queue=max_queue, debounce=0)
+        self.worker.start()
+        
+    def drain_until(self, count, timeout=5.0):
+        # Drain one item at a time, like a slow UI would
+        items = []
+        deadline = time.monotonic() + timeout
+        while len(items) < count and time.monotonic() < deadline:
+            items.extend(self.worker.drain(1))
+            time.sleep(0.01)
+        return items
+        
+    def test_events_are_queued_off_thread(self):
+        # Appended lines are parsed by the worker and handed over through the queue
+        self.start_worker()
+        time.sleep(0.1)  # Let the initial catch-up read finish
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write(LINE.format(3, 1))
+            
+        items = self.drain_until(1)
+        self.assertEqual(len(items), 1)
+        event, written_at = items[0]
+        self.assertEqual(event['type'], 'map_start')
+        self.assertEqual(event['seed'], 1)
+        self.assertIsNotNone(written_at)
+        
+    def test_backpressure_keeps_order(self):
+        # With a queue of one, the worker waits for the consumer instead of dropping events
+        self.start_worker(max_queue=1)
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            for i in range(5):
+                f.write(LINE.format(i, i))
+                
+        time.sleep(0.2)
+        items = self.drain_until(5)
+        self.assertEqual([event['seed'] for event, _ in items], [0, 1, 2, 3, 4])
+        
+        metrics = self.worker.metrics()
+        self.assertEqual(metrics['produced'], 5)
+        self.assertEqual(metrics['consumed'], 5)
+        self.assertEqual(metrics['requeued'], 0)
+        self.assertEqual(metrics['high_water'], 1)
+        self.assertGreaterEqual(metrics['full_waits'], 1)
+        
+    def test_stop_while_blocked(self):
+        # Stopping must not hang when the queue is full and nobody drains it
+        self.start_worker(max_queue=1)
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write(LINE.format(1, 1))
+            f.write(LINE.format(2, 2))
+        time.sleep(0.2)
+        
+        self.worker.stop()
+        self.assertFalse(self.worker.is_running())
+        self.assertEqual(self.worker.metrics()['requeued'], 1)
+        
+    def test_restart_delivers_undrained_events(self):
+        # Events queued or not yet read when the worker stops come back on the next start
+        self.start_worker(max_queue=3)
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            for i in range(10):
+                f.write(LINE.format(i, i))
+        time.sleep(0.2)
+        first = self.drain_until(2)
+        self.worker.stop()
+        
+        self.start_worker(max_queue=3)
+        rest = self.drain_until(8)
+        time.sleep(0.1)
+        rest.extend(self.worker.drain())
+        self.assertEqual([event['seed'] for event, _ in first + rest], list(range(10)))
+
+    def test_failed_read_is_retried(self):
+        # A read error, e.g. while the log is rotated, must not end the worker thread
+        iter_updates = self.log_parser.iter_updates
+        calls = []
+        def failing_once():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("log file is being replaced")
+            return iter_updates()
+        self.log_parser.iter_updates = failing_once
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write(LINE.format(1, 1))
+        self.start_worker()
+        
+        items = self.drain_until(1)
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write(LINE.format(2, 2))
+        items.extend(self.drain_until(1))
+        self.assertEqual([event['seed'] for event, _ in items], [1, 2])
+        self.assertEqual(self.worker.metrics()['errors'], 1)
+        self.assertTrue(self.worker.is_running())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,8 @@ from datetime import datetime
 import sys
 import time
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from src.utils.log_parser import LogParser
+from src.utils.log_parser import LogParser, parse_log_timestamp
+from src.utils.log_scanner import scan_log_parallel, split_ranges
 
 class TestLogParser(unittest.TestCase):
     def setUp(self):
@@ -16,6 +17,7 @@ class TestLogParser(unittest.TestCase):
         
     def tearDown(self):
         # Clean up the test log file
+        self.log_parser.close()
         if self.test_log_path.exists():
             self.test_log_path.unlink()
             
@@ -65,6 +67,7 @@ class TestLogParser(unittest.TestCase):
         for display_name, map_name in special_maps:
             # Reset the file and parser for each test
             self.test_log_path.touch()
+            self.log_parser.close()
             self.log_parser = LogParser(str(self.test_log_path))
             
             # Write test content
@@ -93,6 +96,7 @@ class TestLogParser(unittest.TestCase):
         
         self.assertEqual(event['type'], 'map_end')
         self.assertEqual(event['next_area'], 'Hideout')
+        self.assertEqual(event['area_kind'], 'hideout')
         self.assertEqual(event['timestamp'], datetime(2025, 1, 30, 18, 10, 45))
         
     def test_multiple_events(self):
@@ -151,6 +155,7 @@ class TestLogParser(unittest.TestCase):
         for log_line, expected_name in test_cases:
             # Reset the file and parser for each test
             self.test_log_path.touch()
+            self.log_parser.close()
             self.log_parser = LogParser(str(self.test_log_path))
             self.log_parser.last_position = 0  # Explicitly reset position
             
@@ -215,5 +220,98 @@ class TestLogParser(unittest.TestCase):
         self.assertEqual(events[0]['map_name'], 'Crimson Temple')
         self.assertEqual(events[0]['map_level'], 75)
 
+    def test_partial_line_carried_over(self):
+        # A line the game is still writing must not be lost or parsed early
+        line = '2025/01/30 18:03:45 3802609 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed 1681684543\n'
+        split_at = line.index('area')
+        with open(self.test_log_path, 'ab') as f:
+            f.write(line[:split_at].encode('utf-8'))
+            
+        events = self.log_parser.check_updates()
+        self.assertEqual(len(events), 0)
+        
+        with open(self.test_log_path, 'ab') as f:
+            f.write(line[split_at:].encode('utf-8'))
+            
+        events = self.log_parser.check_updates()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['map_name'], 'Hidden Grotto')
+        self.assertEqual(events[0]['seed'], 1681684543)
+        
+    def test_other_event_types(self):
+        # Instance connects, deaths and level ups come from the same pass as area changes
+        log_lines = [
+            '2025/01/30 18:03:40 3802609 2caa1679 [INFO Client 25000] Connecting to instance server at 10.0.0.1:6112\n',
+            '2025/01/30 18:03:45 3802609 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed 1681684543\n',
+            '2025/01/30 18:05:00 3802609 2caa1679 [INFO Client 25000] : Wanderer (Monk) is now level 45\n',
+            '2025/01/30 18:06:00 3802609 2caa1679 [INFO Client 25000] #Someone: I has been slain. lol\n',
+            '2025/01/30 18:07:00 3802609 2caa1679 [INFO Client 25000] : Wanderer has been slain.\n',
+            '2025/01/30 18:07:05 3802609 2caa1679 [DEBUG Client 25000] Generating level 1 area "HideoutFelled" with seed 1\n'
+        ]
+        with open(self.test_log_path, 'w', encoding='utf-8') as f:
+            f.writelines(log_lines)
+            
+        events = self.log_parser.check_updates()
+        self.assertEqual([event['type'] for event in events],
+                         ['instance_connect', 'map_start', 'level_up', 'player_death', 'map_end'])
+        self.assertEqual(events[0]['address'], '10.0.0.1:6112')
+        self.assertEqual(events[2]['character'], 'Wanderer')
+        self.assertEqual(events[2]['character_class'], 'Monk')
+        self.assertEqual(events[2]['level'], 45)
+        # Chat lines mentioning a death are not deaths
+        self.assertEqual(events[3]['timestamp'], datetime(2025, 1, 30, 18, 7, 0))
+        self.assertEqual(events[4]['area_kind'], 'hideout')
+        
+    def test_fast_timestamp_matches_strptime(self):
+        # Fixed-layout decoding must agree with strptime, including across days
+        for stamp in ('2025/01/30 18:03:45', '2025/01/31 00:00:00', '2024/02/29 23:59:59', '2025/01/30 07:08:09'):
+            self.assertEqual(parse_log_timestamp(stamp), datetime.strptime(stamp, '%Y/%m/%d %H:%M:%S'))
+        for stamp in ('2025/02/30 18:03:45', '2025/01/30 24:00:00', '2025/01/30T18:03:45', '2025/01/30 18:03'):
+            with self.assertRaises(ValueError):
+                parse_log_timestamp(stamp)
+                
+    def test_only_appended_bytes_are_read(self):
+        # Lines written before the parser started are skipped, new ones are parsed
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write('2025/01/30 18:03:45 3802609 2caa1679 [DEBUG Client 25000] Generating level 65 area "MapHiddenGrotto" with seed 1681684543\n')
+        self.log_parser.close()
+        self.log_parser = LogParser(str(self.test_log_path))
+        
+        with open(self.test_log_path, 'a', encoding='utf-8') as f:
+            f.write('2025/01/30 18:04:00 3802609 2caa1679 [INFO Client 25000] Some unrelated line\r\n')
+            f.write('2025/01/30 18:10:45 3802609 2caa1679 [DEBUG Client 25000] Generating level 1 area "HideoutFelled" with seed 1\r\n')
+            
+        events = self.log_parser.check_updates()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['type'], 'map_end')
+        self.assertEqual(events[0]['next_area'], 'HideoutFelled')
+        self.assertEqual(self.log_parser.last_position, self.test_log_path.stat().st_size)
+        
+    def test_parallel_scan_matches_sequential(self):
+        # Chunked parallel scanning must give exactly the sequential events
+        areas = ['MapHiddenGrotto', 'HideoutFelled', 'MapMesa', 'G1_town', 'BreachDomain_01']
+        with open(self.test_log_path, 'w', encoding='utf-8', newline='') as f:
+            for i in range(300):
+                if i % 7 == 0:
+                    f.write(f'2025/01/30 18:{i // 60:02d}:{i % 60:02d} 1 2caa1679 [DEBUG Client 25000] '
+                            f'Generating level {60 + i % 20} area "{areas[i % len(areas)]}" with seed {i}\r\n')
+                else:
+                    f.write('2025/01/30 18:00:00 1 2caa1679 [INFO Client 25000] Some other line\r\n')
+            # Last line without a newline
+            f.write('2025/01/30 19:00:00 1 2caa1679 [DEBUG Client 25000] Generating level 1 area "HideoutFelled" with seed 9')
+            
+        ranges = split_ranges(self.test_log_path, 8)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], self.test_log_path.stat().st_size)
+        
+        sequential_stats = {}
+        sequential = list(self.log_parser.scan_history(sequential_stats))
+        for workers in (1, 3):
+            parallel_stats = {}
+            parallel = list(scan_log_parallel(self.test_log_path, workers, parallel_stats))
+            self.assertEqual(parallel, sequential)
+            self.assertEqual(parallel_stats['lines'], sequential_stats['lines'])
+        self.assertEqual(len(sequential), 44)
+        
 if __name__ == '__main__':
     unittest.main()